@@ -1,3 +1,82 @@
 from django.contrib import admin
+from .models import Hotel, Room, Booking, Payment, RoomNight, SeasonalRate, StayDiscount, IdempotencyKey, Job, DailyRoomTypeStats, Amenity
 
-# Register your models here.
+
+@admin.register(Hotel)
+class HotelAdmin(admin.ModelAdmin):
+    list_display = ('name', 'location', 'rating')
+    search_fields = ('name', 'location')
+
+
+@admin.register(Room)
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'room_type', 'price_per_night', 'capacity', 'availability')
+    list_filter = ('availability',)
+    # Room.__str__ reads room.hotel.name
+    list_select_related = ('hotel',)
+    raw_id_fields = ('hotel',)
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'room', 'check_in', 'check_out', 'status', 'payment_status')
+    list_filter = ('status', 'payment_status')
+    # Booking.__str__ reads user.username and room.hotel.name
+    list_select_related = ('user', 'room__hotel')
+    raw_id_fields = ('user', 'room')
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'amount', 'payment_method', 'status', 'created_at')
+    list_filter = ('status',)
+    raw_id_fields = ('booking',)
+
+
+@admin.register(SeasonalRate)
+class SeasonalRateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'hotel', 'room', 'start_date', 'end_date', 'weekdays', 'multiplier')
+    list_select_related = ('hotel', 'room__hotel')
+    raw_id_fields = ('hotel', 'room')
+
+
+@admin.register(StayDiscount)
+class StayDiscountAdmin(admin.ModelAdmin):
+    list_display = ('hotel', 'min_nights', 'percent')
+    list_select_related = ('hotel',)
+    raw_id_fields = ('hotel',)
+
+
+@admin.register(RoomNight)
+class RoomNightAdmin(admin.ModelAdmin):
+    list_display = ('room', 'night', 'booking')
+    list_select_related = ('room__hotel', 'booking__user', 'booking__room__hotel')
+    raw_id_fields = ('room', 'booking')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'scope', 'user', 'status_code', 'created_at', 'expires_at')
+    list_filter = ('scope',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'kind', 'status', 'attempts', 'run_at', 'last_error')
+    list_filter = ('status', 'kind')
+
+
+@admin.register(DailyRoomTypeStats)
+class DailyRoomTypeStatsAdmin(admin.ModelAdmin):
+    list_display = ('hotel', 'room_type', 'date', 'rooms_sold', 'revenue', 'paid_revenue')
+    list_filter = ('room_type',)
+    list_select_related = ('hotel',)
+    raw_id_fields = ('hotel',)
+
+
+@admin.register(Amenity)
+class AmenityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key')
+    search_fields = ('name', 'key')
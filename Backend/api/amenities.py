@@ -0,0 +1,112 @@
+"""
+Normalized amenity index. Hotel.amenities and Room.amenities (JSON lists)
+remain the source of truth; sync_hotels()/sync_rooms() mirror them into
+HotelAmenity/RoomAmenity rows keyed by canonical Amenity. "Has Pool AND
+Spa" then becomes one probe of the unique (hotel, amenity) index per
+amenity instead of a text search through each JSON list, and a paginated
+search can stop as soon as it has a page of matches.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Amenity, Hotel, HotelAmenity, Room, RoomAmenity
+
+SYNC_BATCH_SIZE = 500
+
+# Model -> (link model, link field)
+_LINKS = {
+    Hotel: (HotelAmenity, 'hotel'),
+    Room: (RoomAmenity, 'room'),
+}
+
+
+def amenity_key(name):
+    """
+    Matching key for an amenity name: whitespace-collapsed and casefolded,
+    so "Free  WiFi" and "free wifi" are the same amenity.
+    """
+    return ' '.join(str(name).split()).casefold()
+
+
+def _names(values):
+    # First spelling of each key wins as the display name
+    names = {}
+    for value in values or []:
+        if isinstance(value, str) and amenity_key(value):
+            names.setdefault(amenity_key(value), ' '.join(value.split()))
+    return names
+
+
+def amenity_ids(names):
+    """
+    Ids of the Amenity rows for the given {key: name} mapping, creating
+    missing ones.
+    """
+    if not names:
+        return {}
+    ids = dict(Amenity.objects.filter(key__in=names).values_list('key', 'pk'))
+    missing = [Amenity(key=key, name=name) for key, name in names.items() if key not in ids]
+    if missing:
+        Amenity.objects.bulk_create(missing, ignore_conflicts=True)
+        ids = dict(Amenity.objects.filter(key__in=names).values_list('key', 'pk'))
+    return ids
+
+
+def _sync(model, objects):
+    link, field = _LINKS[model]
+    objects = list(objects)
+    for i in range(0, len(objects), SYNC_BATCH_SIZE):
+        per_object = {obj.pk: _names(obj.amenities) for obj in objects[i:i + SYNC_BATCH_SIZE]}
+        all_names = {}
+        for names in per_object.values():
+            for key, name in names.items():
+                all_names.setdefault(key, name)
+        with transaction.atomic():
+            ids = amenity_ids(all_names)
+            link.objects.filter(**{f'{field}_id__in': list(per_object)}).delete()
+            link.objects.bulk_create([
+                link(**{f'{field}_id': pk, 'amenity_id': ids[key]})
+                for pk, names in per_object.items() for key in names
+            ])
+
+
+def sync_hotels(hotels):
+    """
+    Replace the amenity links of the given (saved) hotels with their
+    current amenities lists.
+    """
+    _sync(Hotel, hotels)
+
+
+def sync_rooms(rooms):
+    _sync(Room, rooms)
+
+
+def rebuild(batch_size=SYNC_BATCH_SIZE):
+    """
+    Recreate every amenity link from the JSON lists. Returns the number of
+    hotels and rooms processed.
+    """
+    done = 0
+    for model in _LINKS:
+        batch = []
+        for obj in model.objects.only('id', 'amenities').order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                _sync(model, batch)
+                done += len(batch)
+                batch = []
+        _sync(model, batch)
+        done += len(batch)
+    return done
+
+
+def filter_by_amenities(queryset, names):
+    """
+    Restrict a Hotel or Room queryset to rows having every one of the
+    given amenities (matched by amenity_key).
+    """
+    link, field = _LINKS[queryset.model]
+    for key in sorted({amenity_key(name) for name in names} - {''}):
+        queryset = queryset.filter(Exists(link.objects.filter(**{field: OuterRef('pk')}, amenity__key=key)))
+    return queryset
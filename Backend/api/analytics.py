@@ -0,0 +1,156 @@
+"""
+Occupancy and revenue reports for staff, computed with SQL aggregates.
+
+Sold room-nights and revenue come from the RoomNight inventory (one row per
+booked room per night, carrying that night's share of the booking total),
+or from the DailyRoomTypeStats rollup when source='rollup'. Capacity is the
+number of rooms times the nights in the range.
+
+    occupancy = sold / available    ADR = revenue / sold    RevPAR = revenue / available
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import DailyRoomTypeStats, Room, RoomNight
+
+GROUPINGS = ('hotel', 'room_type', 'day')
+SOURCES = ('live', 'rollup')
+MAX_RANGE_DAYS = 3 * 366
+
+# Group-by field for each source
+_LIVE_FIELDS = {'hotel': 'room__hotel', 'room_type': 'room__room_type', 'day': 'night'}
+_ROLLUP_FIELDS = {'hotel': 'hotel', 'room_type': 'room_type', 'day': 'date'}
+_ROOM_FIELDS = {'hotel': ('hotel', 'hotel__name'), 'room_type': ('room_type',)}
+CENT = Decimal('0.01')
+
+
+def _sold(start, end, group_by, hotel, source):
+    """
+    Room-nights sold and revenue per group, as {group value: totals}.
+    """
+    if source == 'rollup':
+        rows = DailyRoomTypeStats.objects.filter(date__gte=start, date__lt=end)
+        if hotel is not None:
+            rows = rows.filter(hotel=hotel)
+        field = _ROLLUP_FIELDS[group_by]
+        aggregates = {
+            'sold': Sum('rooms_sold'), 'revenue_sum': Sum('revenue'), 'paid_sum': Sum('paid_revenue'),
+        }
+    else:
+        rows = RoomNight.objects.filter(night__gte=start, night__lt=end)
+        if hotel is not None:
+            rows = rows.filter(room__hotel=hotel)
+        field = _LIVE_FIELDS[group_by]
+        aggregates = {
+            'sold': Count('id'),
+            'revenue_sum': Sum('revenue'),
+            'paid_sum': Sum('revenue', filter=Q(booking__payment_status='paid')),
+        }
+    return {
+        row[field]: {'sold': row['sold'], 'revenue': row['revenue_sum'], 'paid_revenue': row['paid_sum']}
+        for row in rows.values(field).annotate(**aggregates).order_by(field)
+    }
+
+
+def _capacity(group_by, hotel):
+    """
+    Room counts keyed by hotel id or room type, each with the fields to
+    report for that group; for day grouping, the total number of rooms.
+    """
+    rooms = Room.objects.all()
+    if hotel is not None:
+        rooms = rooms.filter(hotel=hotel)
+    if group_by == 'day':
+        return rooms.count()
+    fields = _ROOM_FIELDS[group_by]
+    groups = {}
+    for row in rooms.values(*fields).annotate(rooms=Count('id')).order_by(*fields):
+        key = {group_by: row[fields[0]]}
+        if group_by == 'hotel':
+            key['hotel_name'] = row['hotel__name']
+        groups[row[fields[0]]] = (key, row['rooms'])
+    return groups
+
+
+def _metrics(rooms, nights, sold=None):
+    available = rooms * nights
+    sold = sold or {}
+    count = sold.get('sold') or 0
+    revenue = sold.get('revenue') or Decimal('0')
+    return {
+        'rooms': rooms,
+        'room_nights_available': available,
+        'room_nights_sold': count,
+        'occupancy': round(count / available, 4) if available else None,
+        'adr': (revenue / count).quantize(CENT) if count else None,
+        'revpar': (revenue / available).quantize(CENT) if available else None,
+        'revenue': revenue.quantize(CENT),
+        'paid_revenue': (sold.get('paid_revenue') or Decimal('0')).quantize(CENT),
+    }
+
+
+def report(start, end, group_by, hotel=None, source='live'):
+    """
+    Occupancy, ADR, RevPAR and revenue for nights in [start, end), per
+    hotel, room type or day, plus totals. Every hotel or room type with
+    rooms gets a row; days only when something was sold.
+    """
+    nights = (end - start).days
+    capacity = _capacity(group_by, hotel)
+    sold = _sold(start, end, group_by, hotel, source)
+    totals = {
+        'sold': sum(row['sold'] for row in sold.values()),
+        'revenue': sum((row['revenue'] or 0 for row in sold.values()), Decimal('0')),
+        'paid_revenue': sum((row['paid_revenue'] or 0 for row in sold.values()), Decimal('0')),
+    }
+
+    if group_by == 'day':
+        total_rooms = capacity
+        rows = [{'date': day, **_metrics(capacity, 1, row)} for day, row in sold.items()]
+    else:
+        total_rooms = sum(rooms for _, rooms in capacity.values())
+        rows = [{**key, **_metrics(rooms, nights, sold.get(value))} for value, (key, rooms) in capacity.items()]
+
+    return {
+        'start': start,
+        'end': end,
+        'group_by': group_by,
+        'source': source,
+        'totals': _metrics(total_rooms, nights, totals),
+        'rows': rows,
+    }
+
+
+def rebuild_rollups(start, end):
+    """
+    Recompute DailyRoomTypeStats for nights in [start, end) from one grouped
+    query over RoomNight. Returns the number of rows written.
+    """
+    rows = (
+        RoomNight.objects.filter(night__gte=start, night__lt=end)
+        .values('room__hotel', 'room__room_type', 'night')
+        .annotate(
+            sold=Count('id'),
+            revenue_sum=Sum('revenue'),
+            paid_sum=Sum('revenue', filter=Q(booking__payment_status='paid')),
+        )
+        .order_by()
+    )
+    stats = [
+        DailyRoomTypeStats(
+            hotel_id=row['room__hotel'],
+            room_type=row['room__room_type'],
+            date=row['night'],
+            rooms_sold=row['sold'],
+            revenue=row['revenue_sum'] or 0,
+            paid_revenue=row['paid_sum'] or 0,
+        )
+        for row in rows.iterator()
+    ]
+    with transaction.atomic():
+        DailyRoomTypeStats.objects.filter(date__gte=start, date__lt=end).delete()
+        DailyRoomTypeStats.objects.bulk_create(stats, batch_size=2000)
+    return len(stats)
+
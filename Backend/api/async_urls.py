@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('hotels/', async_views.hotel_list, name='async_hotel_list'),
+    path('hotels/<int:pk>/', async_views.hotel_detail, name='async_hotel_detail'),
+    path('rooms/', async_views.room_list, name='async_room_list'),
+    path('bookings/', async_views.booking_list, name='async_booking_list'),
+]
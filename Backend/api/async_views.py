@@ -0,0 +1,77 @@
+"""
+Async read endpoints for the ASGI deployment (see README, "ASGI deployment").
+
+They mirror the catalogue and booking GET endpoints in api.views but use
+Django's async ORM, so a worker is not blocked while queries are in flight.
+Serializers only run on rows that are already loaded; lists are read as
+.values() rows (see api.rows) and accept ?fields= / ?exclude=. Only GET and
+HEAD are allowed.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .authentication import ClaimsJWTAuthentication
+from .fieldsets import selected_fields
+from .models import Booking, Hotel
+from .renderers import FastJSONRenderer
+from .rows import projection
+from .search import SearchParamError, filter_rooms
+from .serializers import BookingSerializer, HotelSerializer, RoomSerializer
+
+
+def _json(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+async def _list(serializer_class, queryset, params):
+    try:
+        rows = projection(serializer_class, selected_fields(params, serializer_class))
+    except SearchParamError as e:
+        return _json({'error': str(e)}, status=400)
+    return _json(rows.serialize([row async for row in rows.values(queryset)]))
+
+
+async def _authenticate(request):
+    try:
+        result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def _unauthorized():
+    return _json({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+
+@require_safe
+async def hotel_list(request):
+    return await _list(HotelSerializer, Hotel.objects.all(), request.GET)
+
+
+@require_safe
+async def hotel_detail(request, pk):
+    if await _authenticate(request) is None:
+        return _unauthorized()
+    hotel = await Hotel.objects.filter(pk=pk).afirst()
+    if hotel is None:
+        return _json({'detail': 'No Hotel matches the given query.'}, status=404)
+    return _json(HotelSerializer(hotel).data)
+
+
+@require_safe
+async def room_list(request):
+    try:
+        rooms = filter_rooms(request.GET)
+    except SearchParamError as e:
+        return _json({'error': str(e)}, status=400)
+    return await _list(RoomSerializer, rooms, request.GET)
+
+
+@require_safe
+async def booking_list(request):
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+    return await _list(BookingSerializer, Booking.objects.filter(user_id=user.pk), request.GET)
@@ -0,0 +1,111 @@
+"""
+JWT authentication with an optional token-user mode (AUTH_TOKEN_USER=true).
+
+Access tokens carry the user's id, username, email, names and is_staff, so
+authenticated requests are served from the token without loading the User
+row. The only per-user state checked is whether the account is still active
+and staff, cached for TOKEN_USER_CACHE_TTL seconds and dropped whenever the
+user is saved or deleted, so deactivation applies at most one TTL later in
+other worker processes.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_CLAIMS = ('username', 'email', 'first_name', 'last_name', 'is_staff')
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens embed USER_CLAIMS.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsTokenUser(TokenUser):
+    is_active = True
+
+    def __init__(self, token, is_staff):
+        super().__init__(token)
+        self._is_staff = is_staff
+
+    @property
+    def id(self):
+        # simplejwt stores the id claim as a string
+        return User._meta.pk.to_python(super().id)
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_staff(self):
+        return self._is_staff
+
+    @property
+    def email(self):
+        return self.token.get('email', '')
+
+    @property
+    def first_name(self):
+        return self.token.get('first_name', '')
+
+    @property
+    def last_name(self):
+        return self.token.get('last_name', '')
+
+
+def _state_key(user_id):
+    return f'token-user:{user_id}'
+
+
+def user_state(user_id):
+    """
+    (is_active, is_staff) for a user id, or None if the user is gone.
+    """
+    key = _state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = User.objects.filter(pk=user_id).values_list('is_active', 'is_staff').first()
+        state = tuple(row) if row else (False, False)
+        cache.set(key, state, settings.TOKEN_USER_CACHE_TTL)
+    return state
+
+
+def forget_user_state(user_id):
+    cache.delete(_state_key(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt's JWTAuthentication, except that with AUTH_TOKEN_USER on it
+    builds request.user from the token claims. Tokens issued before claims
+    were embedded still go through the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.AUTH_TOKEN_USER or not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        is_active, is_staff = user_state(user_id)
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # Staff status comes from the cached row so demotion is not held
+        # back by the token lifetime
+        return ClaimsTokenUser(validated_token, is_staff)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+
+from .models import RoomNight
+
+
+def booked_nights(check_in, check_out):
+    """
+    Inventory rows for nights in [check_in, check_out), a range scan on the
+    (room, night) unique index.
+    """
+    return RoomNight.objects.filter(night__gte=check_in, night__lt=check_out)
+
+
+def is_room_available(room, check_in, check_out, exclude_booking=None):
+    """
+    Return True if the room can be sold for [check_in, check_out).
+    """
+    room_id = getattr(room, 'pk', room)
+    nights = booked_nights(check_in, check_out).filter(room_id=room_id)
+    if exclude_booking is not None:
+        nights = nights.exclude(booking_id=getattr(exclude_booking, 'pk', exclude_booking))
+    return not nights.exists()
+
+
+def booked_room_ids(room_ids, check_in, check_out):
+    """
+    Return the subset of room_ids that are taken for [check_in, check_out),
+    answered with a single query.
+    """
+    return set(
+        booked_nights(check_in, check_out)
+        .filter(room_id__in=list(room_ids))
+        .values_list('room_id', flat=True)
+        .distinct()
+    )
+
+
+def booked_nights_by_room(room_ids, start, end):
+    """
+    Map room id -> set of booked nights within [start, end), fetched with a
+    single query.
+    """
+    nights = {}
+    rows = booked_nights(start, end).filter(room_id__in=list(room_ids)).values_list('room_id', 'night')
+    for room_id, night in rows:
+        nights.setdefault(room_id, set()).add(night)
+    return nights
+
+
+def stay_nights(check_in, check_out):
+    return {check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)}
+
+
+def available_room_ids(room_ids, check_in, check_out):
+    """
+    Return the subset of room_ids that are free for [check_in, check_out),
+    answered with a single query.
+    """
+    room_ids = set(room_ids)
+    return room_ids - booked_room_ids(room_ids, check_in, check_out)
+
+
+def filter_available_rooms(queryset, check_in, check_out):
+    """
+    Restrict a Room queryset to rooms that are open for sale and have no
+    booked night in the range, as a correlated NOT EXISTS subquery.
+    """
+    taken = booked_nights(check_in, check_out).filter(room_id=OuterRef('pk'))
+    return queryset.filter(availability=True).filter(~Exists(taken))
@@ -0,0 +1,96 @@
+from django.db import transaction
+
+from .availability import booked_nights_by_room, stay_nights
+from .inventory import sync_bookings
+from .models import Booking, Payment, Room
+from .pricing import quote_stays
+
+BULK_MODES = ('all_or_nothing', 'best_effort')
+MAX_BULK_BOOKINGS = 200
+
+
+def booking_total(room, check_in, check_out, guests=1):
+    stay = {'room': room.pk, 'check_in': check_in, 'check_out': check_out, 'guests': guests}
+    return quote_stays([stay], rooms={room.pk: room})[0]['total']
+
+
+def create_bulk_bookings(user, items, mode):
+    """
+    Book many rooms at once. `items` is a list of (index, data) pairs where
+    data holds validated room id, check_in, check_out and guests.
+
+    Rooms are locked and availability for every item is answered by one
+    query; Booking and Payment rows are then written with bulk_create inside
+    the same transaction. In all_or_nothing mode nothing is written if any
+    item fails.
+
+    Returns {index: (Booking, None) or (None, errors)}.
+    """
+    if not items:
+        return {}
+
+    results = {}
+    with transaction.atomic():
+        room_ids = {data['room'] for _, data in items}
+        rooms = {
+            room.pk: room
+            for room in Room.objects.select_for_update(of=('self',))
+            .select_related('hotel')
+            .filter(pk__in=room_ids)
+            .order_by('pk')
+        }
+        start = min(data['check_in'] for _, data in items)
+        end = max(data['check_out'] for _, data in items)
+        taken = booked_nights_by_room(rooms.keys(), start, end)
+
+        pending = []
+        for index, data in items:
+            room = rooms.get(data['room'])
+            check_in, check_out = data['check_in'], data['check_out']
+            if room is None:
+                error = 'Room not found.'
+            elif not room.availability:
+                error = 'Room is not open for booking.'
+            elif not taken.get(room.pk, set()).isdisjoint(stay_nights(check_in, check_out)):
+                error = 'Room is already booked for these dates.'
+            else:
+                error = None
+
+            if error:
+                results[index] = (None, {'room': [error]})
+                continue
+
+            # Later items in the same batch must not overlap this one
+            taken.setdefault(room.pk, set()).update(stay_nights(check_in, check_out))
+            pending.append((index, Booking(
+                user_id=user.pk,
+                room=room,
+                check_in=check_in,
+                check_out=check_out,
+                guests=data['guests'],
+            )))
+
+        if mode == 'all_or_nothing' and results:
+            return results
+
+        quotes = quote_stays(
+            [
+                {'room': b.room_id, 'check_in': b.check_in, 'check_out': b.check_out, 'guests': b.guests}
+                for _, b in pending
+            ],
+            rooms=rooms,
+        )
+        for (_, booking), quote in zip(pending, quotes):
+            booking.total_price = quote['total']
+
+        bookings = Booking.objects.bulk_create([booking for _, booking in pending])
+        # bulk_create skips post_save, so fill the inventory here
+        sync_bookings(bookings)
+        Payment.objects.bulk_create([
+            Payment(booking=booking, amount=booking.total_price, payment_method='', status='pending')
+            for booking in bookings
+        ])
+        for (index, _), booking in zip(pending, bookings):
+            results[index] = (booking, None)
+
+    return results
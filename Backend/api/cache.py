@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+CATALOGUE_CACHE_ALIAS = 'catalogue'
+
+# Query params whose results depend on Booking rows; those requests bypass the cache
+UNCACHEABLE_PARAMS = ('check_in', 'check_out')
+
+# Backends that keep entries in the worker process, so each worker (and
+# each restart) has its own generation tokens
+PER_PROCESS_BACKENDS = (DummyCache, LocMemCache)
+
+
+class CacheStats:
+    """
+    Per-process hit/miss counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = self.bypassed = 0
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[CATALOGUE_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'catalogue:gen:{scope}'
+
+
+def _timeout():
+    return getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300)
+
+
+def _version_timeout():
+    # Tokens expire with the data they guard. With a per-process cache this
+    # bounds how long a worker that missed a write keeps serving stale
+    # payloads and ETags.
+    return _timeout()
+
+
+def get_versions(*scopes):
+    """
+    Current generation token for each scope. A scope that has never been
+    written (or whose token was evicted) gets a fresh token, so stale entries
+    can never be served again.
+    """
+    cache = get_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, timeout=_version_timeout())
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def _new_versions(scopes):
+    get_cache().set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, timeout=_version_timeout())
+
+
+def bump(*scopes):
+    """
+    Invalidate every entry built from the given scopes.
+
+    Inside a transaction the tokens change again once it commits: until
+    then other connections still read the old rows, and a payload they
+    cache under the first new token would outlive the write.
+    """
+    _new_versions(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _new_versions(scopes))
+
+
+def is_shared():
+    """
+    True when all workers see the same generation tokens. Tokens from a
+    per-process cache are fine for invalidating that worker's entries but
+    cannot identify a version of the data to clients.
+    """
+    return not isinstance(get_cache(), PER_PROCESS_BACKENDS)
+
+
+def _query_digest(request):
+    query = sorted(request.query_params.lists())
+    return hashlib.md5(repr(query).encode()).hexdigest()
+
+
+def is_cacheable(request):
+    return request.method == 'GET' and not any(request.query_params.get(p) for p in UNCACHEABLE_PARAMS)
+
+
+def build_key(request, scopes):
+    versions = get_versions(*scopes)
+    return 'catalogue:{}:{}:{}'.format(request.path, ':'.join(versions), _query_digest(request))
+
+
+def catalogue_etag(request, scopes):
+    """
+    Strong ETag derived from the scope generation tokens, or None when the
+    response depends on bookings or the catalogue cache is per-process.
+    """
+    if not is_cacheable(request) or not is_shared():
+        return None
+    return hashlib.md5(build_key(request, scopes).encode()).hexdigest()
+
+
+def cached_response(request, scopes, render):
+    """
+    Read-through cache for serialized catalogue payloads. `render` returns the
+    DRF response to use (and store) on a miss.
+    """
+    if not is_cacheable(request):
+        stats.record('bypassed')
+        return render()
+
+    cache = get_cache()
+    key = build_key(request, scopes)
+    data = cache.get(key)
+    if data is not None:
+        stats.record('hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    stats.record('misses')
+    response = render()
+    if response.status_code == 200:
+        data = list(response.data) if isinstance(response.data, list) else dict(response.data)
+        cache.set(key, data, timeout=_timeout())
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CatalogueCacheMixin:
+    """
+    Caches GET list/retrieve payloads of catalogue views. Subclasses declare
+    cache_scopes(); entries are invalidated by the signals in api.signals.
+    """
+
+    def cache_scopes(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, self.cache_scopes(), lambda: super(CatalogueCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, self.cache_scopes(), lambda: super(CatalogueCacheMixin, self).retrieve(request, *args, **kwargs))
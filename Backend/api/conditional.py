@@ -0,0 +1,53 @@
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import catalogue_etag
+
+
+class ConditionalGetMixin:
+    """
+    Adds strong ETags to GET list/retrieve responses and answers a matching
+    If-None-Match with 304 before any serialization happens. Subclasses
+    provide get_etag(request), returning None to opt a request out.
+    """
+
+    def get_etag(self, request):
+        raise NotImplementedError
+
+    def _conditional(self, request, render, exists=lambda: True):
+        etag = self.get_etag(request) if request.method == 'GET' else None
+        if etag is None:
+            return render()
+
+        etag = quote_etag(etag)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        # * matches any current representation, so only once there is one
+        if etag in if_none_match or ('*' in if_none_match and exists()):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = render()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(
+            request,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+            # get_object() raises Http404 for a missing object
+            exists=lambda: self.get_object() is not None,
+        )
+
+
+class CatalogueConditionalGetMixin(ConditionalGetMixin):
+    """
+    ETags for catalogue views, taken from the same generation tokens as the
+    catalogue cache (see CatalogueCacheMixin.cache_scopes).
+    """
+
+    def get_etag(self, request):
+        return catalogue_etag(request, self.cache_scopes())
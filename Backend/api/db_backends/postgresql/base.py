@@ -0,0 +1,19 @@
+import time
+
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+
+from api.dbstats import connection_stats
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """
+    PostgreSQL backend that records how long each connection takes to
+    obtain: the TCP+auth handshake, or the wait for a pooled connection.
+    """
+
+    def get_new_connection(self, conn_params):
+        began = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            connection_stats.record(time.perf_counter() - began)
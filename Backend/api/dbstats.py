@@ -0,0 +1,62 @@
+import os
+import threading
+
+
+class ConnectionStats:
+    """
+    Per-process timings for obtaining a database connection: a fresh
+    connect, or a checkout when pooling is enabled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, duration):
+        with self._lock:
+            self.acquisitions += 1
+            self.total_s += duration
+            self.max_s = max(self.max_s, duration)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'acquisitions': self.acquisitions,
+                'avg_ms': round(self.total_s / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+                'max_ms': round(self.max_s * 1000, 3),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.acquisitions = 0
+            self.total_s = self.max_s = 0.0
+
+
+connection_stats = ConnectionStats()
+
+
+def database_stats(connection):
+    """
+    Connection settings, acquire timings and (when pooling) pool occupancy
+    for this worker process.
+    """
+    stats = {
+        'pid': os.getpid(),
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+        'acquire': connection_stats.as_dict(),
+        'pool': None,
+    }
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        pool_stats = pool.get_stats()
+        in_use = pool_stats.get('pool_size', 0) - pool_stats.get('pool_available', 0)
+        stats['pool'] = dict(
+            pool_stats,
+            in_use=in_use,
+            saturation=round(in_use / pool.max_size, 3) if pool.max_size else 0.0,
+        )
+    return stats
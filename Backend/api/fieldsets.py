@@ -0,0 +1,118 @@
+"""
+Sparse fieldsets: ?fields=id,name,image keeps only the listed top-level
+fields of a response, ?exclude=description,images drops them. The choice
+reaches the database too: instance reads load the selected columns with
+only(), and row reads (see api.rows) select only their .values() lookups.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.pagination import CursorPagination
+
+from .search import SearchParamError
+
+
+@lru_cache(maxsize=None)
+def readable_fields(serializer_class):
+    """
+    {name: source} of the fields a serializer class outputs, in order.
+    """
+    return {
+        name: field.source for name, field in serializer_class().fields.items() if not field.write_only
+    }
+
+
+def _names(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+
+def selected_fields(params, serializer_class):
+    """
+    The output fields chosen by ?fields= and ?exclude=, in serializer
+    order, or None when the request does not restrict them.
+    """
+    only, exclude = _names(params, 'fields'), _names(params, 'exclude')
+    if only is None and exclude is None:
+        return None
+    available = readable_fields(serializer_class)
+    unknown = [name for name in (only or []) + (exclude or []) if name not in available]
+    if unknown:
+        raise SearchParamError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    fields = tuple(
+        name for name in available if (only is None or name in only) and name not in (exclude or ())
+    )
+    if not fields:
+        raise SearchParamError("fields/exclude must leave at least one field")
+    return fields
+
+
+def _column_path(model, source):
+    # The lookup for a source reached through forward relations and ending
+    # in a column, e.g. room.hotel.name -> room__hotel__name; None for
+    # annotations, reverse relations and properties
+    parts = source.split('.')
+    try:
+        for part in parts[:-1]:
+            field = model._meta.get_field(part)
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return None
+            model = field.related_model
+        field = model._meta.get_field(parts[-1])
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    return '__'.join(parts)
+
+
+def defer_unselected(queryset, sources):
+    """
+    Load only the columns behind the given serializer sources (plus the
+    primary key), joining just the relations they traverse.
+    """
+    paths = [path for path in (_column_path(queryset.model, source) for source in sources) if path]
+    relations = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*paths)
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields= / ?exclude= on GET responses of a generic view. extra_sources()
+    names what must be loaded beyond the output fields.
+    """
+
+    def selected_fields(self):
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = selected_fields(self.request.query_params, self.get_serializer_class())
+        return self._selected_fields
+
+    def extra_sources(self, queryset):
+        # Cursor pagination reads its position from the page's last item
+        if isinstance(self.paginator, CursorPagination):
+            return [field.lstrip('-') for field in self.paginator.get_ordering(self.request, queryset, self)]
+        return []
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.selected_fields()
+        if fields is None:
+            return queryset
+        sources = readable_fields(self.get_serializer_class())
+        return defer_unselected(queryset, [sources[name] for name in fields] + self.extra_sources(queryset))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.selected_fields()
+        if fields is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in set(target.fields) - set(fields):
+                target.fields.pop(name)
+        return serializer
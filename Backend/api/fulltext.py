@@ -0,0 +1,177 @@
+"""
+Full-text hotel search over name, description, location and address.
+
+On SQLite the text is copied into an FTS5 table (api_hotel_fts, rowid =
+hotel id) that sync_hotels() refreshes whenever hotels are saved, deleted or
+bulk-written. On PostgreSQL the migration adds a generated, GIN-indexed
+tsvector column (api_hotel.search_vector), which the database keeps current
+itself. Other backends fall back to icontains filters.
+
+Every word of a query must match, the last one as a prefix, so "harb in"
+finds "Harbor Inn". Name matches rank above location, address and
+description matches. Scoring every match of a short prefix costs far more
+than finding them, so typeahead ranks at most RANK_WINDOW name matches,
+then as many matches in any column; each extra letter narrows the sets
+until the ranking is exact.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Hotel
+
+FTS_TABLE = 'api_hotel_fts'
+# bm25() column weights, in FTS_COLUMNS order
+FTS_COLUMNS = ('name', 'description', 'location', 'address')
+FTS_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+MAX_TERMS = 8
+# Shorter final prefixes match too much of the catalogue to be useful
+MIN_PREFIX_LENGTH = 2
+RANK_WINDOW = 1000
+SYNC_BATCH_SIZE = 500
+
+_WORD = re.compile(r'\w+')
+
+
+def terms(text):
+    """
+    The words of a query, lowercased; the last one is matched as a prefix.
+    """
+    words = _WORD.findall((text or '').lower())[:MAX_TERMS]
+    if words and len(words[-1]) < MIN_PREFIX_LENGTH:
+        words.pop()
+    return words
+
+
+def _fts5_query(words):
+    # Quoted strings keep FTS5 operators (AND, NEAR, column:) literal
+    return ' '.join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def _tsquery(words, weights=''):
+    # \w+ words contain none of the tsquery operator characters; a weight
+    # label (A = name) restricts a word to that part of search_vector
+    return ' & '.join([f'{word}:{weights}' if weights else word for word in words[:-1]] + [f'{words[-1]}:*{weights}'])
+
+
+def sync_hotels(pks):
+    """
+    Refresh the SQLite index rows of the given hotels (deleted ones are
+    dropped). Needed after writes that skip the post_save/post_delete
+    signals, such as bulk_create.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pks = list(pks)
+    columns = ', '.join(FTS_COLUMNS)
+    with connection.cursor() as cursor:
+        for i in range(0, len(pks), SYNC_BATCH_SIZE):
+            batch = pks[i:i + SYNC_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', batch)
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM api_hotel WHERE id IN ({placeholders})',
+                batch,
+            )
+
+
+def rebuild():
+    """
+    Recreate the SQLite index from every hotel. Returns the number of
+    hotels indexed.
+    """
+    if connection.vendor != 'sqlite':
+        return Hotel.objects.count()
+    columns = ', '.join(FTS_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM api_hotel')
+        return cursor.rowcount
+
+
+def _icontains(words):
+    condition = Q()
+    for word in words:
+        condition &= (
+            Q(name__icontains=word) | Q(location__icontains=word)
+            | Q(address__icontains=word) | Q(description__icontains=word)
+        )
+    return condition
+
+
+def filter_hotels(queryset, text):
+    """
+    Restrict a Hotel queryset to those matching the query text.
+    """
+    words = terms(text)
+    if not words:
+        return queryset.none()
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts5_query(words)])
+    elif connection.vendor == 'postgresql':
+        matches = RawSQL(
+            "SELECT id FROM api_hotel WHERE search_vector @@ to_tsquery('simple', %s)", [_tsquery(words)]
+        )
+    else:
+        return queryset.filter(_icontains(words))
+    return queryset.filter(pk__in=matches)
+
+
+def _ranked_window(words, limit, name_only=False):
+    # Best `limit` of the first RANK_WINDOW matches, in index order
+    if connection.vendor == 'sqlite':
+        query = _fts5_query(words)
+        if name_only:
+            query = f'name : ({query})'
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        sql = (
+            f'SELECT id FROM (SELECT rowid AS id, bm25({FTS_TABLE}, {weights}) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s) '
+            f'ORDER BY score, id LIMIT %s'
+        )
+        params = [query, RANK_WINDOW, limit]
+    else:
+        sql = (
+            "SELECT id FROM (SELECT id, ts_rank(search_vector, query) AS score "
+            "FROM api_hotel, to_tsquery('simple', %s) query WHERE search_vector @@ query LIMIT %s) matches "
+            "ORDER BY score DESC, id LIMIT %s"
+        )
+        params = [_tsquery(words, 'A' if name_only else ''), RANK_WINDOW, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ranked_ids(text, limit=10):
+    """
+    Ids of the best `limit` hotels matching the query text, best first.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return list(
+            Hotel.objects.filter(_icontains(words)).order_by('-rating', 'id').values_list('pk', flat=True)[:limit]
+        )
+    # A scoring window holds whichever matches the index yields first, so
+    # on a common prefix it could miss the best names; name matches get a
+    # window of their own, and matches elsewhere fill any remaining places
+    ids = _ranked_window(words, limit, name_only=True)
+    if len(ids) < limit:
+        seen = set(ids)
+        ids += [pk for pk in _ranked_window(words, limit + len(ids)) if pk not in seen][:limit - len(ids)]
+    return ids
+
+
+def suggest(text, limit=10):
+    """
+    Typeahead: the best matching hotels, best first, loading only the
+    fields a suggestion list shows.
+    """
+    ids = ranked_ids(text, limit)
+    hotels = Hotel.objects.only('id', 'name', 'location', 'rating').in_bulk(ids)
+    return [hotels[pk] for pk in ids if pk in hotels]
@@ -0,0 +1,114 @@
+"""
+Payment gateway interface. PAYMENT_GATEWAY names the implementation and
+PAYMENT_GATEWAY_OPTIONS its keyword arguments; FakeGateway is a local
+stand-in with configurable latency and failure rates.
+"""
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """
+    A transient failure (timeout, 5xx); the call may be retried.
+    """
+
+
+class PaymentDeclined(Exception):
+    """
+    The gateway refused the charge; retrying will not help.
+    """
+
+
+class InvalidWebhook(Exception):
+    pass
+
+
+class PaymentGateway:
+    def create_intent(self, amount, metadata=None):
+        """
+        Start a payment; returns {'id', 'client_secret', 'amount'}.
+        """
+        raise NotImplementedError
+
+    def charge(self, amount, payment_method, idempotency_key):
+        """
+        Capture `amount` and return the gateway's transaction id. Calls with
+        the same idempotency_key must not charge twice.
+        """
+        raise NotImplementedError
+
+    def parse_webhook(self, body, headers):
+        """
+        Verify a webhook request and return its event as a dict with 'type'
+        and 'transaction_id'; raises InvalidWebhook.
+        """
+        raise NotImplementedError
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Sleeps `latency_ms` per call, fails with GatewayError at `failure_rate`
+    and declines charges at `decline_rate`. Webhooks are signed with
+    HMAC-SHA256 of the body in the Fake-Signature header.
+    """
+    SIGNATURE_HEADER = 'Fake-Signature'
+
+    # Charges by idempotency key, shared by all instances in the process
+    _charges = {}
+    _lock = threading.Lock()
+
+    def __init__(self, latency_ms=0, failure_rate=0.0, decline_rate=0.0, webhook_secret=''):
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self.webhook_secret = webhook_secret
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise GatewayError('Gateway timed out')
+
+    def create_intent(self, amount, metadata=None):
+        self._call()
+        intent_id = f'pi_fake_{uuid.uuid4().hex}'
+        return {'id': intent_id, 'client_secret': f'{intent_id}_secret_{uuid.uuid4().hex[:16]}', 'amount': amount}
+
+    def charge(self, amount, payment_method, idempotency_key):
+        self._call()
+        with self._lock:
+            if idempotency_key in self._charges:
+                return self._charges[idempotency_key]
+            if random.random() < self.decline_rate:
+                raise PaymentDeclined('Card declined')
+            transaction_id = self._charges[idempotency_key] = f'ch_fake_{uuid.uuid4().hex}'
+        return transaction_id
+
+    def sign(self, body):
+        return hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+
+    def parse_webhook(self, body, headers):
+        # Fail closed: without a secret no event can be authenticated
+        if not self.webhook_secret:
+            raise InvalidWebhook('Webhook secret is not configured')
+        if not hmac.compare_digest(headers.get(self.SIGNATURE_HEADER, ''), self.sign(body)):
+            raise InvalidWebhook('Bad signature')
+        try:
+            event = json.loads(body)
+        except ValueError:
+            raise InvalidWebhook('Body is not JSON')
+        if not isinstance(event, dict) or not event.get('type') or not event.get('transaction_id'):
+            raise InvalidWebhook('Event needs a type and a transaction_id')
+        return event
+
+
+def get_gateway():
+    return import_string(settings.PAYMENT_GATEWAY)(**settings.PAYMENT_GATEWAY_OPTIONS)
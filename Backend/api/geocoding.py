@@ -0,0 +1,104 @@
+"""
+Offline geocoding of hotels from a local gazetteer; no network calls.
+
+A gazetteer is a CSV file with name, latitude and longitude columns, where
+name is a place as hotels write it ("Miami, FL"). The bundled one lists
+major US cities; pass a larger export (e.g. from GeoNames) for wider
+coverage. Hotels are placed at the place named at the end of their address,
+or failing that their location, so coordinates are city-level.
+"""
+import csv
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from django.db import transaction
+
+from . import cache, geohash
+from .models import Hotel
+
+DEFAULT_GAZETTEER = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+_WORD = re.compile(r'[^\W\d_]+')
+
+
+def place_key(text):
+    """
+    Lowercased words without numbers, so "Miami, FL 33139" and "miami fl"
+    are the same place.
+    """
+    return ' '.join(_WORD.findall((text or '').casefold()))
+
+
+def load_gazetteer(path=None):
+    """
+    {place key: (latitude, longitude)} from a gazetteer CSV.
+    """
+    places = {}
+    with open(path or DEFAULT_GAZETTEER, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            key = place_key(row['name'])
+            if key:
+                places.setdefault(key, (float(row['latitude']), float(row['longitude'])))
+    return places
+
+
+def _candidates(hotel):
+    # Most specific first: the address's trailing "City, ST ZIP" parts
+    parts = [place_key(part) for part in (hotel.address or '').split(',')]
+    parts = [part for part in parts if part]
+    for size in (3, 2, 1):
+        if len(parts) >= size:
+            yield ' '.join(parts[-size:])
+    yield place_key(hotel.location)
+
+
+def geocode(hotel, gazetteer):
+    """
+    (latitude, longitude) for a hotel, or None if no place matches.
+    """
+    for key in _candidates(hotel):
+        if key in gazetteer:
+            return gazetteer[key]
+    return None
+
+
+def backfill(gazetteer, overwrite=False, batch_size=1000):
+    """
+    Set coordinates on hotels that lack them (or on all hotels, with
+    overwrite). Returns (geocoded, unmatched) counts.
+    """
+    hotels = Hotel.objects.only('id', 'location', 'address').order_by('pk')
+    if not overwrite:
+        hotels = hotels.filter(latitude__isnull=True)
+    geocoded = unmatched = 0
+    # Geocoding is city-level, so a batch holds few distinct points; one
+    # UPDATE per point is far cheaper than bulk_update's per-row CASE
+    batch = defaultdict(list)
+
+    def flush():
+        pks = [pk for point_pks in batch.values() for pk in point_pks]
+        with transaction.atomic():
+            for (latitude, longitude), point_pks in batch.items():
+                Hotel.objects.filter(pk__in=point_pks).update(
+                    latitude=latitude, longitude=longitude, geohash=geohash.encode(latitude, longitude),
+                )
+        # update() skips the post_save invalidation signals
+        cache.bump('hotels', *[f'hotel:{pk}' for pk in pks])
+        batch.clear()
+        return len(pks)
+
+    pending = 0
+    for hotel in hotels.iterator(chunk_size=batch_size):
+        point = geocode(hotel, gazetteer)
+        if point is None:
+            unmatched += 1
+            continue
+        batch[point].append(hotel.pk)
+        pending += 1
+        if pending >= batch_size:
+            geocoded += flush()
+            pending = 0
+    if batch:
+        geocoded += flush()
+    return geocoded, unmatched
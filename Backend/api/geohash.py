@@ -0,0 +1,96 @@
+"""
+Geohash encoding and cell coverings for proximity search without PostGIS.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+points sharing a prefix lie in the same grid cell and every cell is a
+contiguous range of an ordinary B-tree index on the hash. A search area is
+covered by a handful of cells, each queried as a range, and the few
+candidates are then filtered and sorted by distance.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Stored precision: 9 characters is a cell of about 5 x 5 metres
+PRECISION = 9
+# Upper bound on the cells (index ranges) used to cover one search area
+MAX_CELLS = 16
+# Sorts after every base32 character, so [cell, cell + END) spans a cell
+END = '{'
+
+EARTH_RADIUS_KM = 6371.0088
+# Of latitude, on the sphere haversine_km() measures
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """
+    (height, width) of a cell in degrees of latitude and longitude.
+    """
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_CELLS):
+    """
+    The geohash cells, at the finest precision needing at most max_cells of
+    them, that together cover the box. The box must not cross the
+    antimeridian.
+    """
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        first_row, last_row = math.floor((min_lat + 90) / height), math.floor((max_lat + 90) / height)
+        first_col, last_col = math.floor((min_lng + 180) / width), math.floor((max_lng + 180) / width)
+        if (last_row - first_row + 1) * (last_col - first_col + 1) <= max_cells or precision == 1:
+            break
+    cells = set()
+    for row in range(first_row, last_row + 1):
+        for col in range(first_col, last_col + 1):
+            # Encode each cell's centre, clamped onto the globe
+            lat = min(max(-90 + (row + 0.5) * height, -90.0), 90.0)
+            lng = min(max(-180 + (col + 0.5) * width, -180.0), 180.0)
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lat, min_lng, max_lat, max_lng) holding every point within
+    radius_km of a point, clamped at the poles and the antimeridian. The
+    longitude span is taken at the latitude nearest the pole, where a
+    degree of longitude is shortest.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(latitude) + dlat, 90.0)))
+    dlng = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return (
+        max(latitude - dlat, -90.0), max(longitude - dlng, -180.0),
+        min(latitude + dlat, 90.0), min(longitude + dlng, 180.0),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
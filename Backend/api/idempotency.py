@@ -0,0 +1,137 @@
+import functools
+import hashlib
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# Share of new keys that also sweep expired ones, keeping the table compact
+PURGE_PROBABILITY = 0.01
+POLL_INTERVAL = 0.05
+
+
+def purge_expired():
+    return IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def _fingerprint(request):
+    return hashlib.sha256(b'\n'.join([
+        request.method.encode(), request.path.encode(), request.body,
+    ])).hexdigest()
+
+
+def _claim(user_id, scope, key, fingerprint):
+    """
+    Insert the pending record for this key. Returns it, or None if another
+    request holds the key.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user_id=user_id, scope=scope, key=key, fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+    except IntegrityError:
+        return None
+
+
+def _replay(record):
+    response = Response(record.response, status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def run_idempotent(request, scope, handler):
+    """
+    Run `handler()` at most once per (user, scope, Idempotency-Key).
+
+    The first request claims the key and stores its response; retries with
+    the same key and body get that response back. A retry that arrives while
+    the first request is still running waits for it (up to
+    IDEMPOTENCY_WAIT_TIMEOUT). Server errors and exceptions release the key
+    so the request can be retried.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'error': f'{HEADER} must be 1-{MAX_KEY_LENGTH} characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    user_id = request.user.pk
+    fingerprint = _fingerprint(request)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    while True:
+        record = _claim(user_id, scope, key, fingerprint)
+        if record is not None:
+            break
+
+        existing = IdempotencyKey.objects.filter(user_id=user_id, scope=scope, key=key).first()
+        if existing is None:
+            continue
+        if existing.fingerprint != fingerprint:
+            return Response(
+                {'error': f'{HEADER} was already used for a different request'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+
+        now = timezone.now()
+        abandoned = now - existing.created_at > timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        if existing.expires_at <= now or (existing.status_code is None and abandoned):
+            # Expired, or its request died without finishing: take it over
+            IdempotencyKey.objects.filter(pk=existing.pk, created_at=existing.created_at).delete()
+            continue
+        if existing.status_code is not None:
+            return _replay(existing)
+        if time.monotonic() >= deadline:
+            return Response(
+                {'error': f'A request with this {HEADER} is still being processed'},
+                status=status.HTTP_409_CONFLICT
+            )
+        time.sleep(POLL_INTERVAL)
+
+    if random.random() < PURGE_PROBABILITY:
+        purge_expired()
+
+    try:
+        response = handler()
+    except Exception:
+        record.delete()
+        raise
+
+    if response.status_code >= 500:
+        record.delete()
+    else:
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=['status_code', 'response'])
+    return response
+
+
+def idempotent(scope):
+    """
+    Decorator for DRF view functions and view methods: honours the
+    Idempotency-Key header via run_idempotent().
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            return run_idempotent(request, scope, lambda: view(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,255 @@
+import csv
+import json
+import math
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+
+from . import amenities, cache, fulltext
+from .models import Hotel, Room
+
+HOTEL_FIELDS = (
+    'name', 'description', 'location', 'rating', 'amenities', 'image', 'images', 'phone', 'email', 'address',
+    'latitude', 'longitude',
+)
+ROOM_FIELDS = (
+    'room_type', 'price_per_night', 'availability', 'capacity', 'amenities', 'image',
+    'included_guests', 'extra_guest_fee',
+)
+LIST_FIELDS = ('amenities', 'images')
+# What a malformed feed row raises while being read into a model instance
+BAD_ROW_ERRORS = (KeyError, TypeError, ValueError, InvalidOperation)
+
+
+def read_rows(path, fmt=None):
+    """
+    Stream dict rows from a CSV or JSON Lines file without loading it whole.
+    """
+    fmt = fmt or ('csv' if str(path).endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _is_true(value):
+    return value in (True, 1) or str(value).strip().lower() in ('1', 'true', 'yes')
+
+
+def _list(value):
+    # CSV cells hold either a JSON list or a "|"-separated list
+    if isinstance(value, list):
+        return value
+    value = (value or '').strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def _blank_to_none(value):
+    return None if value == '' else value
+
+
+def _float(value):
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'{value!r} is not a finite number')
+    return number
+
+
+def _coordinate(row, field, limit):
+    # bulk_create skips the model's range validators
+    if row.get(field) in (None, ''):
+        return None
+    number = _float(row[field])
+    if not -limit <= number <= limit:
+        raise ValueError(f'{field} {number} is outside [-{limit}, {limit}]')
+    return number
+
+
+def _amount(value):
+    number = Decimal(str(value))
+    # Room amounts are DecimalField(max_digits=10, decimal_places=2)
+    if not number.is_finite() or not 0 <= number < 10 ** 8:
+        raise ValueError(f'{value!r} is not a valid amount')
+    return number
+
+
+def hotel_from_row(row):
+    hotel = Hotel(external_id=str(row['external_id']))
+    for field in HOTEL_FIELDS:
+        if field in LIST_FIELDS:
+            setattr(hotel, field, _list(row.get(field)))
+        elif field == 'rating':
+            setattr(hotel, field, _float(row.get('rating') or 0))
+        elif field == 'latitude':
+            setattr(hotel, field, _coordinate(row, field, 90))
+        elif field == 'longitude':
+            setattr(hotel, field, _coordinate(row, field, 180))
+        elif field == 'description':
+            setattr(hotel, field, row.get('description') or '')
+        else:
+            setattr(hotel, field, _blank_to_none(row.get(field)))
+    # bulk_create skips Hotel.save()
+    hotel.set_geohash()
+    return hotel
+
+
+def room_from_row(row, hotel_id):
+    return Room(
+        hotel_id=hotel_id,
+        external_id=str(row.get('external_id') or f"{row['hotel_external_id']}/{row['room_type']}"),
+        room_type=row['room_type'],
+        price_per_night=_amount(row['price_per_night']),
+        availability=_is_true(row['availability']) if row.get('availability') not in (None, '') else True,
+        capacity=int(row.get('capacity') or 2),
+        amenities=_list(row.get('amenities')),
+        image=_blank_to_none(row.get('image')),
+        included_guests=int(row.get('included_guests') or 2),
+        extra_guest_fee=_amount(row.get('extra_guest_fee') or 0),
+    )
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.hotels = 0
+        self.rooms = 0
+        self.deleted = 0
+        self.skipped = 0
+
+    @property
+    def rows(self):
+        return self.hotels + self.rooms + self.deleted
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.hotels} hotels, {self.rooms} rooms upserted, {self.deleted} deleted, "
+            f"{self.skipped} skipped in {time.perf_counter() - self.started:.1f}s "
+            f"({self.rate():.0f} rows/s)"
+        )
+
+
+# Lookup from each deletable model to its bookings
+_BOOKINGS = {Hotel: 'rooms__booking', Room: 'booking'}
+
+
+def _delete_batch(model, rows, stats):
+    """
+    Delete the rows' hotels or rooms. Booked ones are kept, since deleting
+    them would cascade to guests' bookings and payments; their rooms are
+    closed for sale instead and the rows counted as skipped. Returns the
+    pks of the closed rooms.
+    """
+    external_ids = [str(row['external_id']) for row in rows if row.get('external_id')]
+    if not external_ids:
+        return []
+    targets = model.objects.filter(external_id__in=external_ids)
+    booked = set(targets.filter(**{f'{_BOOKINGS[model]}__isnull': False}).values_list('pk', flat=True))
+    stats.deleted += targets.exclude(pk__in=booked).delete()[1].get(model._meta.label, 0)
+    if not booked:
+        return []
+    stats.skipped += len(booked)
+    rooms = Room.objects.filter(pk__in=booked) if model is Room else Room.objects.filter(hotel__in=booked)
+    closed = list(rooms.values_list('pk', flat=True))
+    rooms.update(availability=False)
+    return closed
+
+
+def upsert_hotels(rows, stats):
+    """
+    Upsert one batch of hotel rows (and rooms nested under "rooms") keyed
+    on external_id, inside one transaction.
+    """
+    keyed = [row for row in rows if row.get('external_id')]
+    stats.skipped += len(rows) - len(keyed)
+    rows = keyed
+    with transaction.atomic():
+        closed = _delete_batch(Hotel, [row for row in rows if _is_true(row.get('deleted', False))], stats)
+        live = [row for row in rows if not _is_true(row.get('deleted', False))]
+        parsed = []
+        for row in live:
+            try:
+                parsed.append((row, hotel_from_row(row)))
+            except BAD_ROW_ERRORS:
+                stats.skipped += 1
+        live = [row for row, _ in parsed]
+        # A conflicting upsert may not touch the same row twice; the last row wins
+        hotels = {hotel.external_id: hotel for _, hotel in parsed}
+        Hotel.objects.bulk_create(
+            list(hotels.values()),
+            update_conflicts=True,
+            unique_fields=['external_id'],
+            update_fields=[*HOTEL_FIELDS, 'geohash'],
+        )
+        stats.hotels += len(hotels)
+
+        ids = dict(Hotel.objects.filter(external_id__in=[str(row['external_id']) for row in live])
+                   .values_list('external_id', 'pk'))
+        fulltext.sync_hotels(ids.values())
+        amenities.sync_hotels(Hotel.objects.filter(pk__in=list(ids.values())).only('id', 'amenities'))
+        nested = [
+            dict(room, hotel_external_id=str(row['external_id']))
+            for row in live for room in (row.get('rooms') or [])
+        ]
+        room_pks = _upsert_rooms(nested, ids, stats) if nested else []
+    # bulk_create skips the post_save signals
+    cache.bump('hotels', 'rooms', *[f'hotel:{pk}' for pk in ids.values()], *[f'room:{pk}' for pk in room_pks + closed])
+
+
+def upsert_rooms(rows, stats):
+    """
+    Upsert one batch of room rows, each naming its hotel by hotel_external_id.
+    """
+    with transaction.atomic():
+        closed = _delete_batch(Room, [row for row in rows if _is_true(row.get('deleted', False))], stats)
+        live = [row for row in rows if not _is_true(row.get('deleted', False))]
+        hotel_keys = {str(row['hotel_external_id']) for row in live if row.get('hotel_external_id')}
+        ids = dict(Hotel.objects.filter(external_id__in=hotel_keys).values_list('external_id', 'pk'))
+        room_pks = _upsert_rooms(live, ids, stats)
+    cache.bump('rooms', *[f'room:{pk}' for pk in room_pks + closed])
+
+
+def _upsert_rooms(rows, hotel_ids, stats):
+    rooms = {}
+    for row in rows:
+        # Rows without a (known) hotel are skipped, like hotels without external_id
+        hotel_id = hotel_ids.get(str(row['hotel_external_id'])) if row.get('hotel_external_id') else None
+        if hotel_id is None:
+            stats.skipped += 1
+            continue
+        try:
+            room = room_from_row(row, hotel_id)
+        except BAD_ROW_ERRORS:
+            stats.skipped += 1
+            continue
+        rooms[room.external_id] = room
+    Room.objects.bulk_create(
+        list(rooms.values()),
+        update_conflicts=True,
+        unique_fields=['external_id'],
+        update_fields=['hotel'] + list(ROOM_FIELDS),
+    )
+    stats.rooms += len(rooms)
+    upserted = list(Room.objects.filter(external_id__in=list(rooms)).only('id', 'amenities'))
+    amenities.sync_rooms(upserted)
+    return [room.pk for room in upserted]
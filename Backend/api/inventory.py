@@ -0,0 +1,78 @@
+from datetime import timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+
+from .models import Booking, RoomNight
+
+# Bookings in these states no longer hold their room
+INACTIVE_BOOKING_STATUSES = ('cancelled',)
+
+
+def is_active(booking):
+    return booking.status not in INACTIVE_BOOKING_STATUSES
+
+
+def nightly_revenue(total, nights):
+    """
+    Split a booking total over its nights; the last night takes the
+    rounding remainder so the parts add up to the total.
+    """
+    if nights <= 0:
+        return []
+    total = Decimal(total or 0)
+    per_night = (total / nights).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+    return [per_night] * (nights - 1) + [total - per_night * (nights - 1)]
+
+
+def booking_nights(booking):
+    nights = (booking.check_out - booking.check_in).days
+    return [
+        RoomNight(
+            room_id=booking.room_id,
+            booking_id=booking.pk,
+            night=booking.check_in + timedelta(days=offset),
+            revenue=revenue,
+        )
+        for offset, revenue in enumerate(nightly_revenue(booking.total_price, nights))
+    ]
+
+
+def sync_bookings(bookings):
+    """
+    Replace the inventory rows of the given (saved) bookings with their
+    current room, dates and status.
+    """
+    bookings = list(bookings)
+    if not bookings:
+        return
+    with transaction.atomic():
+        RoomNight.objects.filter(booking_id__in=[b.pk for b in bookings]).delete()
+        RoomNight.objects.bulk_create(
+            [night for booking in bookings if is_active(booking) for night in booking_nights(booking)]
+        )
+
+
+def rebuild(batch_size=1000):
+    """
+    Recreate the whole inventory table from Booking. Returns the number of
+    room-night rows written. If legacy bookings overlap, the first one
+    written keeps the night.
+    """
+    with transaction.atomic():
+        RoomNight.objects.all().delete()
+        batch = []
+        bookings = (
+            Booking.objects.exclude(status__in=INACTIVE_BOOKING_STATUSES)
+            .only('id', 'room_id', 'check_in', 'check_out', 'total_price')
+            .order_by('created_at', 'id')
+            .iterator(chunk_size=batch_size)
+        )
+        for booking in bookings:
+            batch.extend(booking_nights(booking))
+            if len(batch) >= batch_size:
+                RoomNight.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+                batch = []
+        RoomNight.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+        # bulk_create reports skipped conflicts as written; count what landed
+        return RoomNight.objects.count()
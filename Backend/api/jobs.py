@@ -0,0 +1,129 @@
+"""
+A small database-backed job queue, so background work needs no broker.
+
+Handlers are registered by kind with @handler; enqueue() stores a Job row and
+`manage.py run_worker` claims and runs due jobs. A job whose handler raises
+is retried with exponential backoff, unless the error is a PermanentJobError
+or max_attempts is reached, in which case it is marked failed and the
+handler's on_failure callback runs.
+"""
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('api.jobs')
+
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help.
+    """
+
+
+def handler(kind, on_failure=None):
+    def register(func):
+        HANDLERS[kind] = (func, on_failure)
+        return func
+    return register
+
+
+def enqueue(kind, payload, max_attempts=None, delay=0):
+    if kind not in HANDLERS:
+        raise ValueError(f'No job handler registered for {kind!r}')
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def backoff(attempts):
+    """
+    Seconds to wait before the next attempt: doubling from JOBS_BACKOFF_BASE,
+    capped at JOBS_BACKOFF_MAX, with jitter so failed jobs do not retry in
+    lockstep.
+    """
+    delay = min(settings.JOBS_BACKOFF_MAX, settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _due(now):
+    # Queued jobs whose time has come, and running jobs whose worker died
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Q(status=Job.QUEUED, run_at__lte=now) | Q(status=Job.RUNNING, locked_at__lt=stale)
+
+
+def claim(pk=None):
+    """
+    Atomically mark one due job (or the given one) as running and return it.
+    A conditional UPDATE does the locking, so any number of workers can poll.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(_due(now))
+    if pk is not None:
+        candidates = candidates.filter(pk=pk)
+    for job_pk in candidates.order_by('run_at').values_list('pk', flat=True)[:10]:
+        claimed = Job.objects.filter(_due(now), pk=job_pk).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_pk)
+    return None
+
+
+def run(job):
+    func, on_failure = HANDLERS[job.kind]
+    try:
+        func(job.payload)
+    except Exception as e:
+        job.last_error = f'{type(e).__name__}: {e}'
+        if isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            logger.warning('Job %s failed after %s attempts: %s', job, job.attempts, job.last_error)
+            if on_failure is not None:
+                on_failure(job.payload, e)
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+    else:
+        job.status = Job.DONE
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_at', 'locked_at', 'last_error', 'updated_at'])
+    return job
+
+
+def run_job(pk):
+    job = claim(pk)
+    return run(job) if job is not None else None
+
+
+def work(burst=False, poll_interval=1.0, max_jobs=None):
+    """
+    Run due jobs until stopped; with burst, return once none are due.
+    Returns the number of jobs run.
+    """
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = claim()
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        done += 1
+    return done
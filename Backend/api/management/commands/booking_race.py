@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Booking, Hotel, Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire many concurrent POST /api/bookings/ requests for the same room and "
+        "dates, and check that exactly one of them wins."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Number of booking requests to send')
+        parser.add_argument('--concurrency', type=int, default=50, help='Number of requests in flight at once')
+        parser.add_argument(
+            '--url',
+            help='Base URL of a running server (e.g. http://localhost:8000). '
+                 'Without it requests go through an in-process client.',
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the fixture hotel, room and users')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        run_id = uuid.uuid4().hex[:8]
+
+        hotel = Hotel.objects.create(name=f'Race {run_id}', description='booking_race fixture', location='Nowhere')
+        room = Room.objects.create(hotel=hotel, room_type='Race Room', price_per_night=100)
+        users = User.objects.bulk_create(
+            User(username=f'race_{run_id}_{i}', email=f'race_{run_id}_{i}@example.com') for i in range(total)
+        )
+        if not users or users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=f'race_{run_id}_').order_by('id'))
+
+        check_in = date.today() + timedelta(days=30)
+        payload = {
+            'room': room.pk,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+            'guests': 1,
+        }
+        send = self._http_sender(options['url'], payload) if options['url'] else self._local_sender(payload)
+
+        start = threading.Barrier(min(options['concurrency'], total))
+        latencies = []
+
+        def fire(user):
+            try:
+                start.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass
+            began = time.perf_counter()
+            try:
+                return send(user)
+            finally:
+                latencies.append(time.perf_counter() - began)
+                connection.close()
+
+        self.stdout.write(f"Sending {total} bookings for room {room.pk} with concurrency {options['concurrency']}...")
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            statuses = Counter(pool.map(fire, users))
+        elapsed = time.perf_counter() - began
+
+        stored = Booking.objects.filter(room=room).count()
+        latencies.sort()
+        self.stdout.write(json.dumps({
+            'requests': total,
+            'concurrency': options['concurrency'],
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+            'bookings_stored': stored,
+            'elapsed_s': round(elapsed, 3),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+            'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1 if len(latencies) > 1 else 0] * 1000, 1),
+        }, indent=2))
+
+        if not options['keep']:
+            hotel.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+        if statuses.get(201, 0) != 1 or stored != 1:
+            raise CommandError(f"Expected exactly one winner, got {statuses.get(201, 0)} (stored: {stored})")
+        self.stdout.write(self.style.SUCCESS('Exactly one booking won the race.'))
+
+    def _local_sender(self, payload):
+        def send(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            return client.post('/api/bookings/', payload, format='json').status_code
+        return send
+
+    def _http_sender(self, base_url, payload):
+        url = base_url.rstrip('/') + '/api/bookings/'
+        body = json.dumps(payload).encode()
+
+        def send(user):
+            request = urllib.request.Request(url, data=body, method='POST', headers={
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}',
+            })
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
+        return send
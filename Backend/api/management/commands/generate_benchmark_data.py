@@ -0,0 +1,147 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import amenities, cache, fulltext, geocoding
+from api.inventory import sync_bookings
+from api.models import Booking, Hotel, Payment, Room
+
+CITIES = (
+    'New York, NY', 'Miami, FL', 'Chicago, IL', 'San Francisco, CA', 'Seattle, WA',
+    'Austin, TX', 'Boston, MA', 'Denver, CO', 'Las Vegas, NV', 'Orlando, FL',
+)
+AMENITIES = ('WiFi', 'Pool', 'Spa', 'Restaurant', 'Gym', 'Parking', 'Bar', 'Beach Access')
+ROOM_TYPES = (('Standard Room', 2, 120), ('Deluxe Room', 3, 200), ('Family Suite', 4, 320), ('Penthouse', 6, 650))
+
+BENCH_PREFIX = 'bench-'
+STAFF_USERNAME = 'bench-staff'
+# Generated bookings use one week-long slot per room, starting here
+BOOKING_EPOCH = date.today() + timedelta(days=7)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible benchmark dataset: hotels, rooms, users and bookings. "
+        "Users are bench-user-<n> (plus bench-staff) sharing one password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=1000)
+        parser.add_argument('--rooms-per-hotel', type=int, default=4)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--bookings', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='bench-pass-123')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--flush', action='store_true', help='Delete a previously generated dataset first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.centres = geocoding.load_gazetteer()
+        batch_size = options['batch_size']
+
+        if options['flush']:
+            self.flush()
+        elif Hotel.objects.filter(external_id__startswith=BENCH_PREFIX).exists():
+            raise CommandError('A benchmark dataset already exists; pass --flush to replace it.')
+
+        with transaction.atomic():
+            Hotel.objects.bulk_create([self.hotel(rng, i) for i in range(options['hotels'])], batch_size=batch_size)
+            hotels = list(Hotel.objects.filter(external_id__startswith=BENCH_PREFIX).order_by('pk'))
+            fulltext.sync_hotels([hotel.pk for hotel in hotels])
+            amenities.sync_hotels(hotels)
+
+            Room.objects.bulk_create(
+                [self.room(rng, hotel, n) for hotel in hotels for n in range(options['rooms_per_hotel'])],
+                batch_size=batch_size,
+            )
+            rooms = list(Room.objects.filter(external_id__startswith=BENCH_PREFIX).order_by('pk'))
+            amenities.sync_rooms(rooms)
+
+            # Hash once; every generated user shares the same password
+            password = make_password(options['password'])
+            User.objects.bulk_create(
+                [User(username=f'bench-user-{i}', email=f'bench-user-{i}@example.com', password=password)
+                 for i in range(options['users'])]
+                + [User(username=STAFF_USERNAME, email='bench-staff@example.com', password=password, is_staff=True)],
+                batch_size=batch_size,
+            )
+            users = list(User.objects.filter(username__startswith='bench-user-').order_by('pk'))
+
+            bookings = []
+            if rooms and users:
+                for i in range(options['bookings']):
+                    bookings.append(self.booking(rng, rooms[i % len(rooms)], i // len(rooms), users[i % len(users)]))
+            bookings = Booking.objects.bulk_create(bookings, batch_size=batch_size)
+            sync_bookings(bookings)
+            Payment.objects.bulk_create(
+                [Payment(booking=b, amount=b.total_price, payment_method='card',
+                         status='completed' if b.payment_status == 'paid' else 'pending')
+                 for b in bookings],
+                batch_size=batch_size,
+            )
+
+        cache.bump('hotels', 'rooms')
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(hotels)} hotels, {len(rooms)} rooms, {len(users)} users "
+            f"(+ {STAFF_USERNAME}) and {len(bookings)} bookings"
+        ))
+
+    def flush(self):
+        Hotel.objects.filter(external_id__startswith=BENCH_PREFIX).delete()
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+    def hotel(self, rng, i):
+        city = CITIES[i % len(CITIES)]
+        # Spread hotels up to ~20 km around the city centre
+        latitude, longitude = self.centres[geocoding.place_key(city)]
+        hotel = Hotel(
+            external_id=f'{BENCH_PREFIX}hotel-{i}',
+            name=f'{rng.choice(("Grand", "Seaside", "Urban", "Royal", "Garden"))} Hotel {i}',
+            description=f'Benchmark hotel {i} in {city}. ' * 8,
+            location=city,
+            address=f'{i} Benchmark Street, {city}',
+            rating=round(rng.uniform(3.0, 5.0), 1),
+            amenities=rng.sample(AMENITIES, rng.randint(2, 6)),
+            image=f'https://example.com/hotels/{i}.jpg',
+            images=[f'https://example.com/hotels/{i}/{n}.jpg' for n in range(3)],
+            phone='+1 (555) 000-0000',
+            email=f'hotel-{i}@example.com',
+            latitude=round(latitude + rng.uniform(-0.18, 0.18), 6),
+            longitude=round(longitude + rng.uniform(-0.18, 0.18), 6),
+        )
+        # bulk_create skips Hotel.save()
+        hotel.set_geohash()
+        return hotel
+
+    def room(self, rng, hotel, n):
+        room_type, capacity, price = ROOM_TYPES[n % len(ROOM_TYPES)]
+        return Room(
+            hotel=hotel,
+            external_id=f'{hotel.external_id}/room-{n}',
+            room_type=room_type,
+            price_per_night=Decimal(price + rng.randint(-20, 40)),
+            capacity=capacity,
+            amenities=rng.sample(AMENITIES, 3),
+            image=f'https://example.com/rooms/{hotel.pk}-{n}.jpg',
+        )
+
+    def booking(self, rng, room, slot, user):
+        check_in = BOOKING_EPOCH + timedelta(days=slot * 7 + rng.randint(0, 3))
+        nights = rng.randint(1, 3)
+        paid = rng.random() < 0.7
+        return Booking(
+            user=user,
+            room=room,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=nights),
+            guests=rng.randint(1, room.capacity),
+            total_price=room.price_per_night * nights,
+            status='confirmed' if paid else 'pending',
+            payment_status='paid' if paid else 'unpaid',
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.geocoding import DEFAULT_GAZETTEER, backfill, load_gazetteer
+
+
+class Command(BaseCommand):
+    help = (
+        "Set hotel coordinates from their address/location using a local gazetteer CSV "
+        "(name,latitude,longitude); no network access is needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gazetteer', default=DEFAULT_GAZETTEER, help='Gazetteer CSV (default: bundled US cities)')
+        parser.add_argument('--overwrite', action='store_true', help='Also re-geocode hotels that have coordinates')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Hotels per bulk update')
+
+    def handle(self, *args, **options):
+        try:
+            gazetteer = load_gazetteer(options['gazetteer'])
+        except (OSError, KeyError, ValueError) as e:
+            raise CommandError(f"Cannot read gazetteer: {e}")
+        began = time.perf_counter()
+        geocoded, unmatched = backfill(gazetteer, overwrite=options['overwrite'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Geocoded {geocoded} hotels ({unmatched} unmatched) in {time.perf_counter() - began:.2f}s"
+        ))
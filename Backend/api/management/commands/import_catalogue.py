@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import ImportStats, chunked, read_rows, upsert_hotels, upsert_rooms
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a partner catalogue feed (CSV or JSON Lines) into Hotel and Room, "
+        "upserting on external_id in batches. Rows with deleted=true are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', help='Hotel feed; JSONL rows may nest a "rooms" list')
+        parser.add_argument('--rooms', help='Room feed; each row names its hotel by hotel_external_id')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Feed format (default: from file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        if not options['hotels'] and not options['rooms']:
+            raise CommandError('Pass --hotels and/or --rooms')
+
+        stats = ImportStats()
+        for option, upsert in (('hotels', upsert_hotels), ('rooms', upsert_rooms)):
+            if not options[option]:
+                continue
+            for batch in chunked(read_rows(options[option], options['format']), options['batch_size']):
+                upsert(batch, stats)
+                self.stdout.write(f"{stats.rows} rows ({stats.rate():.0f} rows/s)")
+
+        self.stdout.write(self.style.SUCCESS(stats.summary()))
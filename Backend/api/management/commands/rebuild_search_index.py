@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.fulltext import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the SQLite full-text hotel index from all hotels "
+        "(PostgreSQL maintains its index itself)."
+    )
+
+    def handle(self, *args, **options):
+        began = time.perf_counter()
+        indexed = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} hotels in {time.perf_counter() - began:.2f}s"
+        ))
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+
+from api.analytics import rebuild_rollups
+from api.models import RoomNight
+
+
+def _date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f"{value!r} is not a date (YYYY-MM-DD)")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the DailyRoomTypeStats rollup used by /api/analytics/?source=rollup "
+        "for nights in [start, end), by default every night in the inventory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date, help="First night to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--end', type=_date, help="Night after the last one to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        bounds = RoomNight.objects.aggregate(first=Min('night'), last=Max('night'))
+        start = options['start'] or bounds['first']
+        end = options['end'] or (bounds['last'] and bounds['last'] + timedelta(days=1))
+        if start is None or end is None:
+            self.stdout.write("No inventory to roll up")
+            return
+        if end <= start:
+            raise CommandError("--end must be after --start")
+        written = rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily rollup rows for {start} to {end}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (payment confirmations, gateway webhooks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once no jobs are due')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle')
+        parser.add_argument('--max-jobs', type=int, help='Exit after running this many jobs')
+
+    def handle(self, *args, **options):
+        done = jobs.work(burst=options['burst'], poll_interval=options['poll_interval'], max_jobs=options['max_jobs'])
+        self.stdout.write(self.style.SUCCESS(f"Ran {done} jobs"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:14
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_room_nights(apps, schema_editor):
+    Booking = apps.get_model('api', 'Booking')
+    RoomNight = apps.get_model('api', 'RoomNight')
+    nights = []
+    for booking in Booking.objects.exclude(status='cancelled').iterator():
+        for offset in range((booking.check_out - booking.check_in).days):
+            nights.append(RoomNight(
+                room_id=booking.room_id,
+                booking_id=booking.pk,
+                night=booking.check_in + timedelta(days=offset),
+            ))
+    # Legacy data may hold overlapping bookings; the first one keeps the night
+    RoomNight.objects.bulk_create(nights, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_pricing_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='api.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='api.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'night'), name='unique_room_night')],
+            },
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
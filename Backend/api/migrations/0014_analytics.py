@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:35
+
+from decimal import ROUND_DOWN, Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_night_revenue(apps, schema_editor):
+    RoomNight = apps.get_model('api', 'RoomNight')
+    batch = []
+    for night in RoomNight.objects.select_related('booking').iterator(chunk_size=2000):
+        booking = night.booking
+        count = (booking.check_out - booking.check_in).days
+        total = Decimal(booking.total_price)
+        per_night = (total / count).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        # The last night takes the rounding remainder, as in api.inventory
+        is_last = (booking.check_out - night.night).days == 1
+        night.revenue = total - per_night * (count - 1) if is_last else per_night
+        batch.append(night)
+        if len(batch) >= 2000:
+            RoomNight.objects.bulk_update(batch, ['revenue'])
+            batch = []
+    RoomNight.objects.bulk_update(batch, ['revenue'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRoomTypeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('rooms_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='roomnight',
+            name='revenue',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='roomnight',
+            index=models.Index(fields=['night'], name='room_night_night_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyroomtypestats',
+            name='hotel',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.hotel'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyroomtypestats',
+            index=models.Index(fields=['date'], name='daily_stats_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyroomtypestats',
+            constraint=models.UniqueConstraint(fields=('hotel', 'room_type', 'date'), name='unique_daily_room_type_stats'),
+        ),
+        migrations.RunPython(backfill_night_revenue, migrations.RunPython.noop),
+    ]
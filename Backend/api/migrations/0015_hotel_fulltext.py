@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Kept in sync by api.fulltext.sync_hotels (see api.signals)
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE api_hotel_fts USING fts5("
+    "name, description, location, address, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO api_hotel_fts (rowid, name, description, location, address) "
+    "SELECT id, name, description, location, address FROM api_hotel",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS api_hotel_fts"]
+
+# A generated column, so PostgreSQL keeps it current on every write
+POSTGRESQL_CREATE = [
+    "ALTER TABLE api_hotel ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(address, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+    ") STORED",
+    "CREATE INDEX hotel_search_vector_idx ON api_hotel USING GIN (search_vector)",
+]
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS hotel_search_vector_idx",
+    "ALTER TABLE api_hotel DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_CREATE, 'postgresql': POSTGRESQL_CREATE})
+
+
+def drop_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_analytics'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_amenities(apps, schema_editor):
+    # Same normalization as api.amenities, on the historical models
+    Amenity = apps.get_model('api', 'Amenity')
+    ids = {}
+
+    def amenity_id(value):
+        key = ' '.join(value.split()).casefold()
+        if key not in ids:
+            ids[key] = Amenity.objects.get_or_create(key=key, defaults={'name': ' '.join(value.split())})[0].pk
+        return ids[key]
+
+    for model, link, field in (('Hotel', 'HotelAmenity', 'hotel_id'), ('Room', 'RoomAmenity', 'room_id')):
+        Link = apps.get_model('api', link)
+        batch = []
+        for pk, values in apps.get_model('api', model).objects.values_list('pk', 'amenities').iterator(chunk_size=2000):
+            amenities = {amenity_id(v) for v in values or [] if isinstance(v, str) and v.strip()}
+            batch.extend(Link(**{field: pk, 'amenity_id': a}) for a in amenities)
+            if len(batch) >= 2000:
+                Link.objects.bulk_create(batch)
+                batch = []
+        Link.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_hotel_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HotelAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hotel_links', to='api.amenity')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='amenity_links', to='api.hotel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'amenity'), name='unique_hotel_amenity')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_links', to='api.amenity')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='amenity_links', to='api.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'amenity'), name='unique_room_amenity')],
+            },
+        ),
+        migrations.RunPython(backfill_amenities, migrations.RunPython.noop),
+    ]
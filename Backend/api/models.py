@@ -1,7 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
+
+from . import geohash
 
 class Hotel(models.Model):
+    # Partner feed identifier, used by import_catalogue to upsert
+    external_id = models.CharField(max_length=100, unique=True, blank=True, null=True)
     name = models.CharField(max_length=200)
     description = models.TextField()
     location = models.CharField(max_length=200)
@@ -12,22 +18,140 @@ class Hotel(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    latitude = models.FloatField(blank=True, null=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(blank=True, null=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    # Derived from latitude/longitude on save; proximity search scans
+    # ranges of it (see api.geohash)
+    geohash = models.CharField(max_length=12, blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating', 'id'], name='hotel_rating_idx'),
+            models.Index(fields=['location'], name='hotel_location_idx'),
+            models.Index(fields=['name', 'id'], name='hotel_name_idx'),
+            # Covers the coordinate filter, so cell scans skip table lookups
+            models.Index(fields=['geohash', 'latitude', 'longitude'], name='hotel_geohash_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def set_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = None
+        else:
+            self.geohash = geohash.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.set_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
 class Room(models.Model):
     hotel = models.ForeignKey(Hotel, related_name="rooms", on_delete=models.CASCADE)
+    external_id = models.CharField(max_length=100, unique=True, blank=True, null=True)
     room_type = models.CharField(max_length=100)
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+    # Whether the room is open for sale at all; date-level availability
+    # is derived from Booking (see api.availability)
     availability = models.BooleanField(default=True)
     capacity = models.IntegerField(default=2)
     amenities = models.JSONField(default=list, blank=True)
     image = models.URLField(max_length=500, blank=True, null=True)
+    # Guests covered by price_per_night; each extra guest pays extra_guest_fee per night
+    included_guests = models.PositiveIntegerField(default=2)
+    extra_guest_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hotel', 'capacity'], name='room_hotel_capacity_idx'),
+            models.Index(fields=['hotel', 'price_per_night'], name='room_hotel_price_idx'),
+        ]
 
     def __str__(self):
         return f"{self.hotel.name} - {self.room_type}"
 
+class SeasonalRate(models.Model):
+    """
+    Multiplies the nightly rate for nights in [start_date, end_date) that fall
+    on one of the selected weekdays. Open-ended dates apply all year, so a
+    weekday-only rule is a weekend/weekday rate. Matching rules compound.
+    """
+    ALL_WEEKDAYS = 0b1111111  # bit 0 = Monday ... bit 6 = Sunday
+
+    hotel = models.ForeignKey(Hotel, related_name="seasonal_rates", on_delete=models.CASCADE)
+    room = models.ForeignKey(Room, related_name="seasonal_rates", on_delete=models.CASCADE, blank=True, null=True)
+    name = models.CharField(max_length=100, blank=True)
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    weekdays = models.PositiveSmallIntegerField(default=ALL_WEEKDAYS)
+    multiplier = models.DecimalField(max_digits=6, decimal_places=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hotel', 'start_date', 'end_date'], name='seasonal_rate_dates_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name or 'Rate'} x{self.multiplier} ({self.hotel_id})"
+
+class StayDiscount(models.Model):
+    """
+    Percentage off the whole stay once it reaches min_nights; the largest
+    qualifying tier wins.
+    """
+    hotel = models.ForeignKey(Hotel, related_name="stay_discounts", on_delete=models.CASCADE)
+    min_nights = models.PositiveIntegerField()
+    percent = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'min_nights'], name='unique_stay_discount_tier'),
+        ]
+
+    def __str__(self):
+        return f"{self.percent}% off {self.min_nights}+ nights ({self.hotel_id})"
+
+class Amenity(models.Model):
+    """
+    Canonical amenity names. The JSON `amenities` lists on Hotel and Room
+    stay the editable source; HotelAmenity/RoomAmenity rows are derived
+    from them (see api.amenities) so amenity filters are index lookups.
+    """
+    # Case- and whitespace-folded name that filters match on
+    key = models.CharField(max_length=100, unique=True)
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+class HotelAmenity(models.Model):
+    hotel = models.ForeignKey(Hotel, related_name="amenity_links", on_delete=models.CASCADE)
+    amenity = models.ForeignKey(Amenity, related_name="hotel_links", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            # Also the index amenity filters probe: does this hotel have X?
+            models.UniqueConstraint(fields=['hotel', 'amenity'], name='unique_hotel_amenity'),
+        ]
+
+    def __str__(self):
+        return f"{self.amenity_id} at hotel {self.hotel_id}"
+
+class RoomAmenity(models.Model):
+    room = models.ForeignKey(Room, related_name="amenity_links", on_delete=models.CASCADE)
+    amenity = models.ForeignKey(Amenity, related_name="room_links", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'amenity'], name='unique_room_amenity'),
+        ]
+
+    def __str__(self):
+        return f"{self.amenity_id} in room {self.room_id}"
+
 from django.utils import timezone
 
 class Booking(models.Model):
@@ -40,10 +164,64 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, default="pending")
     payment_status = models.CharField(max_length=20, default="unpaid")
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['room', 'check_in', 'check_out'], name='booking_room_dates_idx'),
+            models.Index(fields=['user', 'updated_at'], name='booking_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Booking by {self.user.username} at {self.room.hotel.name}"
 
+class RoomNight(models.Model):
+    """
+    One row per room per night held by an active booking, maintained from
+    Booking (see api.inventory). Availability checks are range scans on
+    (room, night) instead of interval overlaps over all bookings.
+    """
+    room = models.ForeignKey(Room, related_name="booked_nights", on_delete=models.CASCADE)
+    night = models.DateField()
+    booking = models.ForeignKey(Booking, related_name="nights", on_delete=models.CASCADE)
+    # The booking's total price spread over its nights, for revenue reports
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'night'], name='unique_room_night'),
+        ]
+        indexes = [
+            # Analytics scan all rooms over a date range
+            models.Index(fields=['night'], name='room_night_night_idx'),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id} on {self.night}"
+
+class DailyRoomTypeStats(models.Model):
+    """
+    Precomputed room-nights sold and revenue per hotel, room type and night,
+    rebuilt from RoomNight by `manage.py rollup_analytics` (see api.analytics).
+    """
+    hotel = models.ForeignKey(Hotel, related_name="daily_stats", on_delete=models.CASCADE)
+    room_type = models.CharField(max_length=100)
+    date = models.DateField()
+    rooms_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'room_type', 'date'], name='unique_daily_room_type_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='daily_stats_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hotel_id} {self.room_type} on {self.date}"
+
 class Payment(models.Model):
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -52,5 +230,66 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Gateway webhooks look payments up by transaction id
+            models.Index(fields=['transaction_id'], name='payment_transaction_idx'),
+        ]
+
+    def __str__(self):
+        return f"Payment for booking {self.booking_id}"
+
+class IdempotencyKey(models.Model):
+    """
+    The stored outcome of a POST sent with an Idempotency-Key header, so a
+    retry gets the same response instead of repeating the side effects (see
+    api.idempotency). status_code is null while the first request runs.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scope', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
+
+class Job(models.Model):
+    """
+    A unit of background work (see api.jobs), run by `manage.py run_worker`.
+    Failed attempts are retried with exponential backoff until max_attempts.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_due_idx'),
+        ]
+
     def __str__(self):
-        return f"Payment for booking {self.booking.id}"
+        return f"{self.kind} #{self.pk} ({self.status})"
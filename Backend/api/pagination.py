@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+from .search import search_ordering
+
+
+class HotelSearchPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return search_ordering(request.query_params)
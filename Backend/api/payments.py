@@ -0,0 +1,91 @@
+"""
+Payment confirmation and gateway webhooks, processed in the background by
+the job queue (api.jobs) so checkout does not wait on the gateway.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import jobs
+from .gateways import PaymentDeclined, get_gateway
+from .models import Booking, Payment
+
+CONFIRM_JOB = 'payments.confirm'
+WEBHOOK_JOB = 'payments.webhook'
+
+# Webhook event type -> (Payment.status, Booking.payment_status)
+WEBHOOK_STATUSES = {
+    'charge.succeeded': ('completed', 'paid'),
+    'charge.failed': ('failed', 'failed'),
+    'charge.refunded': ('refunded', 'refunded'),
+}
+
+
+def request_confirmation(booking, amount, payment_method):
+    """
+    Record the payment as processing and queue the gateway charge.
+    """
+    with transaction.atomic():
+        payment, created = Payment.objects.get_or_create(
+            booking=booking,
+            defaults={'amount': amount, 'payment_method': payment_method, 'status': 'processing'}
+        )
+        if not created and payment.status != 'completed':
+            payment.amount = amount
+            payment.payment_method = payment_method
+            payment.status = 'processing'
+            payment.save(update_fields=['amount', 'payment_method', 'status'])
+        if payment.status == 'processing':
+            # update() skips auto_now; bump updated_at so booking list ETags change
+            Booking.objects.filter(pk=booking.pk).update(payment_status='processing', updated_at=timezone.now())
+            jobs.enqueue(CONFIRM_JOB, {'payment': payment.pk})
+    return payment
+
+
+def _set_status(payment, payment_status, booking_payment_status, transaction_id=None):
+    with transaction.atomic():
+        payment.status = payment_status
+        fields = ['status']
+        if transaction_id:
+            payment.transaction_id = transaction_id
+            fields.append('transaction_id')
+        payment.save(update_fields=fields)
+
+        booking = payment.booking
+        booking.payment_status = booking_payment_status
+        if booking_payment_status == 'paid':
+            booking.status = 'confirmed'
+        # save() rather than update() so updated_at and inventory follow
+        booking.save()
+
+
+def _confirmation_failed(payload, error):
+    payment = Payment.objects.select_related('booking').filter(pk=payload['payment']).first()
+    if payment is not None and payment.status == 'processing':
+        _set_status(payment, 'failed', 'failed')
+
+
+@jobs.handler(CONFIRM_JOB, on_failure=_confirmation_failed)
+def process_confirmation(payload):
+    payment = Payment.objects.select_related('booking').get(pk=payload['payment'])
+    if payment.status != 'processing':
+        return
+    try:
+        transaction_id = get_gateway().charge(
+            payment.amount, payment.payment_method, idempotency_key=f'payment:{payment.pk}',
+        )
+    except PaymentDeclined as e:
+        raise jobs.PermanentJobError(str(e))
+    # GatewayError propagates, so the job is retried with backoff
+    _set_status(payment, 'completed', 'paid', transaction_id)
+
+
+@jobs.handler(WEBHOOK_JOB)
+def process_webhook(event):
+    statuses = WEBHOOK_STATUSES.get(event['type'])
+    if statuses is None:
+        return
+    payment = Payment.objects.select_related('booking').filter(transaction_id=event['transaction_id']).first()
+    if payment is None:
+        raise jobs.PermanentJobError(f"No payment with transaction id {event['transaction_id']}")
+    if payment.status != statuses[0]:
+        _set_status(payment, *statuses)
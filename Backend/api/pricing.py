@@ -0,0 +1,133 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Q
+
+from .models import Room, SeasonalRate, StayDiscount
+
+CENT = Decimal('0.01')
+MAX_QUOTES = 5000
+
+
+def weekday_counts(start, end):
+    """
+    Number of nights in [start, end) falling on each weekday (Monday first),
+    computed arithmetically rather than by walking the dates.
+    """
+    weeks, extra = divmod((end - start).days, 7)
+    counts = [weeks] * 7
+    first = start.weekday()
+    for offset in range(extra):
+        counts[(first + offset) % 7] += 1
+    return counts
+
+
+def rate_nights(rules, check_in, check_out):
+    """
+    Sum over the nights of [check_in, check_out) of the compounded multiplier
+    of the rules matching each night.
+
+    The stay is cut at rule boundaries; within a segment the same date rules
+    apply throughout, so only per-weekday night counts are needed. Cost grows
+    with the number of rules, not the length of the stay.
+    """
+    if not rules:
+        return Decimal((check_out - check_in).days)
+
+    points = {check_in, check_out}
+    for rule in rules:
+        for boundary in (rule.start_date, rule.end_date):
+            if boundary and check_in < boundary < check_out:
+                points.add(boundary)
+    points = sorted(points)
+
+    total = Decimal(0)
+    for seg_start, seg_end in zip(points, points[1:]):
+        active = [
+            rule for rule in rules
+            if (rule.start_date is None or rule.start_date <= seg_start)
+            and (rule.end_date is None or rule.end_date >= seg_end)
+        ]
+        for weekday, count in enumerate(weekday_counts(seg_start, seg_end)):
+            if not count:
+                continue
+            multiplier = Decimal(1)
+            for rule in active:
+                if rule.weekdays >> weekday & 1:
+                    multiplier *= rule.multiplier
+            total += multiplier * count
+    return total
+
+
+def quote_stays(stays, rooms=None):
+    """
+    Price many stays at once. Each stay is a dict with room (id), check_in,
+    check_out and guests. Rooms, seasonal rates and stay discounts are loaded
+    with one query each; pass `rooms` ({id: Room}) to reuse loaded rows.
+
+    Returns one dict per stay, in order: nights, base, guest_surcharge,
+    discount and total as Decimals, or an 'error' for unknown rooms.
+    """
+    stays = list(stays)
+    if not stays:
+        return []
+
+    rooms = dict(rooms or {})
+    missing = {stay['room'] for stay in stays} - rooms.keys()
+    if missing:
+        rooms.update(Room.objects.in_bulk(missing))
+
+    hotel_ids = {room.hotel_id for room in rooms.values()}
+    span_start = min(stay['check_in'] for stay in stays)
+    span_end = max(stay['check_out'] for stay in stays)
+
+    rates_by_hotel = {}
+    for rate in SeasonalRate.objects.filter(
+        Q(start_date__isnull=True) | Q(start_date__lt=span_end),
+        Q(end_date__isnull=True) | Q(end_date__gt=span_start),
+        hotel_id__in=hotel_ids,
+    ):
+        rates_by_hotel.setdefault(rate.hotel_id, []).append(rate)
+
+    discounts_by_hotel = {}
+    for discount in StayDiscount.objects.filter(hotel_id__in=hotel_ids).order_by('-min_nights'):
+        discounts_by_hotel.setdefault(discount.hotel_id, []).append(discount)
+
+    rules_by_room = {}
+    quotes = []
+    for stay in stays:
+        room = rooms.get(stay['room'])
+        if room is None:
+            quotes.append({'room': stay['room'], 'error': 'Room not found.'})
+            continue
+
+        if room.pk not in rules_by_room:
+            rules_by_room[room.pk] = [
+                rate for rate in rates_by_hotel.get(room.hotel_id, ())
+                if rate.room_id in (None, room.pk)
+            ]
+
+        check_in, check_out = stay['check_in'], stay['check_out']
+        nights = (check_out - check_in).days
+        base = room.price_per_night * rate_nights(rules_by_room[room.pk], check_in, check_out)
+        extra_guests = max(0, stay.get('guests', 1) - room.included_guests)
+        guest_surcharge = room.extra_guest_fee * extra_guests * nights
+        subtotal = base + guest_surcharge
+
+        percent = next(
+            (d.percent for d in discounts_by_hotel.get(room.hotel_id, ()) if nights >= d.min_nights),
+            Decimal(0),
+        )
+        discount = subtotal * percent / 100
+
+        quotes.append({
+            'room': room.pk,
+            'check_in': check_in,
+            'check_out': check_out,
+            'guests': stay.get('guests', 1),
+            'nights': nights,
+            'base': base.quantize(CENT, ROUND_HALF_UP),
+            'guest_surcharge': guest_surcharge.quantize(CENT, ROUND_HALF_UP),
+            'discount': discount.quantize(CENT, ROUND_HALF_UP),
+            'total': (subtotal - discount).quantize(CENT, ROUND_HALF_UP),
+        })
+    return quotes
@@ -0,0 +1,191 @@
+import contextvars
+import logging
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+from .rows import RowProjection
+
+logger = logging.getLogger('api.profiling')
+
+# Serializer time of the request being profiled, or None when not profiling
+_serializer_time = contextvars.ContextVar('serializer_time', default=None)
+
+# Frames from these packages are skipped when looking for a query's origin
+_LIBRARY_PATHS = ('/django/', '/rest_framework/', '/rest_framework_simplejwt/', '/asgiref/', 'api/profiling.py')
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'wall_s', 'max_wall_s', 'queries', 'db_s', 'serializer_s', 'bytes', 'errors')
+
+    def __init__(self):
+        self.requests = self.queries = self.bytes = self.errors = 0
+        self.wall_s = self.max_wall_s = self.db_s = self.serializer_s = 0.0
+
+    def as_dict(self):
+        n = self.requests or 1
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_ms': round(self.wall_s / n * 1000, 3),
+            'max_ms': round(self.max_wall_s * 1000, 3),
+            'queries': self.queries,
+            'avg_queries': round(self.queries / n, 2),
+            'avg_db_ms': round(self.db_s / n * 1000, 3),
+            'avg_serializer_ms': round(self.serializer_s / n * 1000, 3),
+            'avg_bytes': round(self.bytes / n),
+        }
+
+
+class ProfileStats:
+    """
+    Per-process aggregates keyed by (method, URL route).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, key, wall, queries, db, serializer, size, status):
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.requests += 1
+            stats.wall_s += wall
+            stats.max_wall_s = max(stats.max_wall_s, wall)
+            stats.queries += queries
+            stats.db_s += db
+            stats.serializer_s += serializer
+            stats.bytes += size
+            if status >= 500:
+                stats.errors += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {f'{method} {route}': stats.as_dict() for (method, route), stats in sorted(self.endpoints.items())}
+
+    def as_prometheus(self):
+        metrics = (
+            ('requests_total', 'counter', lambda s: s.requests),
+            ('errors_total', 'counter', lambda s: s.errors),
+            ('wall_seconds_total', 'counter', lambda s: s.wall_s),
+            ('wall_seconds_max', 'gauge', lambda s: s.max_wall_s),
+            ('db_queries_total', 'counter', lambda s: s.queries),
+            ('db_seconds_total', 'counter', lambda s: s.db_s),
+            ('serializer_seconds_total', 'counter', lambda s: s.serializer_s),
+            ('response_bytes_total', 'counter', lambda s: s.bytes),
+        )
+        lines = []
+        with self._lock:
+            for name, kind, value in metrics:
+                lines.append(f'# TYPE stayeasy_http_{name} {kind}')
+                for (method, route), stats in sorted(self.endpoints.items()):
+                    route = route.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'stayeasy_http_{name}{{method="{method}",route="{route}"}} {value(stats)}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+
+stats = ProfileStats()
+
+
+def _timed(func):
+    def timed(*args, **kwargs):
+        began = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = _serializer_time.get()
+            if elapsed is not None:
+                elapsed[0] += time.perf_counter() - began
+    timed._profiled = True
+    return timed
+
+
+def _instrument_serializers():
+    # Top-level .data calls only: nested serializers go through
+    # to_representation, so time is not double counted
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, '_profiled', False):
+            cls.data = property(_timed(cls.data.fget))
+    # List views serializing .values() rows (see api.rows)
+    if not getattr(RowProjection.serialize, '_profiled', False):
+        RowProjection.serialize = _timed(RowProjection.serialize)
+
+
+def query_origin():
+    """
+    The innermost stack frame in project code that issued a query.
+    """
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        if not any(path in frame.filename for path in _LIBRARY_PATHS) and 'site-packages' not in frame.filename:
+            return f'{frame.filename}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper that counts and times queries and logs the
+    slow ones with the code that issued them.
+    """
+
+    def __init__(self, slow_threshold):
+        self.slow_threshold = slow_threshold
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        began = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - began
+            self.count += 1
+            self.elapsed += duration
+            if duration >= self.slow_threshold:
+                logger.warning(
+                    'Slow query (%.1f ms) from %s: %s', duration * 1000, query_origin(), sql[:2000],
+                )
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (PROFILING_ENABLED) per-request profiling: wall time, DB query
+    count and time, serializer time and response size, aggregated per
+    endpoint in `stats`. Queries slower than PROFILING_SLOW_QUERY_MS are
+    logged to the api.profiling logger.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'PROFILING_SLOW_QUERY_MS', 100) / 1000
+        _instrument_serializers()
+
+    def __call__(self, request):
+        timer = QueryTimer(self.slow_threshold)
+        serializer_time = [0.0]
+        token = _serializer_time.set(serializer_time)
+        began = time.perf_counter()
+        try:
+            with connections['default'].execute_wrapper(timer):
+                response = self.get_response(request)
+        finally:
+            _serializer_time.reset(token)
+        wall = time.perf_counter() - began
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unresolved'
+        size = 0 if response.streaming else len(response.content)
+        stats.record((request.method, route), wall, timer.count, timer.elapsed, serializer_time[0], size, response.status_code)
+        return response
@@ -0,0 +1,276 @@
+import bisect
+import math
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Exists, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery
+from django.utils.dateparse import parse_date
+
+from . import amenities, fulltext, geohash
+from .availability import filter_available_rooms
+from .models import Hotel, Room
+
+# sort_by value -> cursor ordering
+SEARCH_ORDERINGS = {
+    'rating': ('-rating', 'id'),
+    'price': ('min_price', 'id'),
+    '-price': ('-min_price', '-id'),
+    'name': ('name', 'id'),
+}
+DEFAULT_SEARCH_ORDERING = 'rating'
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+DEFAULT_NEARBY_LIMIT = 20
+MAX_NEARBY_LIMIT = 100
+# Nearby search widens its circle from this radius by this factor
+NEARBY_START_RADIUS_KM = 1
+NEARBY_GROWTH = 4
+
+
+class SearchParamError(ValueError):
+    pass
+
+
+def _decimal(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    # Decimal also parses inf and NaN, which the database cannot compare
+    if number is None or not number.is_finite():
+        raise SearchParamError(f'{name} must be a number')
+    return number
+
+
+def _int(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise SearchParamError(f'{name} must be an integer')
+
+
+def _date(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise SearchParamError(f'{name} must be a date (YYYY-MM-DD)')
+    return parsed
+
+
+def _float(params, name, low, high):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not low <= number <= high:
+        raise SearchParamError(f'{name} must be a number between {low} and {high}')
+    return number
+
+
+def _bbox(params):
+    value = params.get('bbox')
+    if value in (None, ''):
+        return None
+    try:
+        box = [float(part) for part in value.split(',')]
+    except ValueError:
+        box = []
+    if (
+        len(box) != 4 or not -90 <= box[0] <= box[2] <= 90 or not -180 <= box[1] <= box[3] <= 180
+    ):
+        raise SearchParamError('bbox must be min_lat,min_lng,max_lat,max_lng')
+    return tuple(box)
+
+
+def _amenities(params, name='amenities'):
+    if hasattr(params, 'getlist'):
+        values = params.getlist(name)
+    else:
+        values = [params.get(name)] if params.get(name) else []
+    return [a.strip() for value in values for a in value.split(',') if a.strip()]
+
+
+def matching_rooms(params):
+    """
+    Rooms satisfying the room-level search filters (guests, price range,
+    room_amenities and date availability). Hotel-level filters are applied
+    by search_hotels.
+    """
+    rooms = amenities.filter_by_amenities(Room.objects.all(), _amenities(params, 'room_amenities'))
+
+    guests = _int(params, 'guests')
+    if guests is not None:
+        rooms = rooms.filter(capacity__gte=guests)
+
+    min_price = _decimal(params, 'min_price')
+    if min_price is not None:
+        rooms = rooms.filter(price_per_night__gte=min_price)
+
+    max_price = _decimal(params, 'max_price')
+    if max_price is not None:
+        rooms = rooms.filter(price_per_night__lte=max_price)
+
+    check_in = _date(params, 'check_in')
+    check_out = _date(params, 'check_out')
+    if bool(check_in) != bool(check_out):
+        raise SearchParamError('check_in and check_out must be given together')
+    if check_in and check_out:
+        if check_out <= check_in:
+            raise SearchParamError('check_out must be after check_in')
+        rooms = filter_available_rooms(rooms, check_in, check_out)
+
+    return rooms
+
+
+def filter_rooms(params):
+    """
+    Room list filtering: matching_rooms plus an optional hotel id.
+    """
+    rooms = matching_rooms(params)
+    hotel = _int(params, 'hotel')
+    if hotel is not None:
+        rooms = rooms.filter(hotel_id=hotel)
+    return rooms
+
+
+def search_hotels(params):
+    """
+    Build the hotel search queryset from request query params.
+
+    Only hotels with at least one matching room are returned; each hotel is
+    annotated with min_price, the cheapest matching room rate.
+    """
+    hotels = Hotel.objects.all()
+
+    query = (params.get('q') or '').strip()
+    if query:
+        hotels = fulltext.filter_hotels(hotels, query)
+
+    location = (params.get('location') or '').strip()
+    if location:
+        hotels = hotels.filter(location__icontains=location)
+
+    min_rating = _decimal(params, 'rating')
+    if min_rating is not None:
+        hotels = hotels.filter(rating__gte=min_rating)
+
+    hotels = amenities.filter_by_amenities(hotels, _amenities(params))
+
+    rooms = matching_rooms(params).filter(hotel=OuterRef('pk'))
+    return hotels.filter(Exists(rooms)).annotate(
+        min_price=Subquery(rooms.order_by('price_per_night').values('price_per_night')[:1])
+    )
+
+
+def search_ordering(params):
+    sort_by = params.get('sort_by') or DEFAULT_SEARCH_ORDERING
+    if sort_by not in SEARCH_ORDERINGS:
+        raise SearchParamError(f"sort_by must be one of: {', '.join(SEARCH_ORDERINGS)}")
+    return SEARCH_ORDERINGS[sort_by]
+
+
+def _flat_scale(latitude, radius):
+    # km per degree of (latitude, longitude), with longitude measured at the
+    # latitude nearest the pole within radius: flat distances taken with
+    # them never exceed the great-circle distance
+    ky = geohash.KM_PER_DEGREE
+    return ky, ky * math.cos(math.radians(min(abs(latitude) + radius / ky, 90.0)))
+
+
+def _hotels_within(latitude, longitude, box, radius, limit):
+    """
+    The `limit` hotels nearest the point among those inside both the box
+    and the radius, each with distance_km set.
+
+    SQL narrows and orders the candidates by a flat-earth lower bound on the
+    distance (no trig functions needed there), which at high latitudes and
+    large radii can be several percent short. Candidates are read in that
+    order and checked with haversine_km() until the lower bound passes the
+    farthest of the `limit` nearest found.
+    """
+    if box[0] > box[2] or box[1] > box[3]:
+        return []
+    in_cells = Q()
+    for cell in geohash.covering_cells(*box):
+        in_cells |= Q(geohash__gte=cell, geohash__lt=cell + geohash.END)
+    ky, kx = _flat_scale(latitude, radius)
+    north_south = (F('latitude') - latitude) * ky
+    east_west = (F('longitude') - longitude) * kx
+    hotels = Hotel.objects.filter(
+        in_cells, latitude__range=(box[0], box[2]), longitude__range=(box[1], box[3]),
+    ).annotate(
+        distance_sq=ExpressionWrapper(north_south * north_south + east_west * east_west, output_field=FloatField()),
+    ).filter(distance_sq__lte=radius * radius)
+
+    found = []
+    for hotel in hotels.order_by('distance_sq', 'id').iterator(chunk_size=limit):
+        if len(found) >= limit and hotel.distance_sq > found[-1].distance_km ** 2:
+            break
+        hotel.distance_km = geohash.haversine_km(latitude, longitude, hotel.latitude, hotel.longitude)
+        if hotel.distance_km <= radius:
+            bisect.insort(found, hotel, key=lambda other: (other.distance_km, other.id))
+            del found[limit:]
+    return found
+
+
+def nearby_hotels(params):
+    """
+    Hotels within radius_km of (lat, lng), or inside bbox, nearest first
+    (to lat/lng, or to the centre of bbox). Returns at most `limit` hotels,
+    each with distance_km set.
+
+    The search starts with a small circle covered by a few geohash cells
+    (each an index range scan) and widens it until it holds `limit` hotels
+    or reaches the requested area, so a dense city answers from the first
+    ring instead of sorting every hotel in the radius.
+    """
+    latitude = _float(params, 'lat', -90, 90)
+    longitude = _float(params, 'lng', -180, 180)
+    if (latitude is None) != (longitude is None):
+        raise SearchParamError('lat and lng must be given together')
+    bbox = _bbox(params)
+    if bbox is None:
+        if latitude is None:
+            raise SearchParamError('lat and lng, or bbox, are required')
+        max_radius = _float(params, 'radius_km', 0, MAX_RADIUS_KM)
+        if max_radius is None:
+            max_radius = DEFAULT_RADIUS_KM
+    else:
+        if latitude is None:
+            latitude, longitude = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+        # Far enough to take in the whole box
+        max_radius = max(
+            geohash.haversine_km(latitude, longitude, lat, lng)
+            for lat in (bbox[0], bbox[2]) for lng in (bbox[1], bbox[3])
+        )
+    limit = _int(params, 'limit')
+    limit = DEFAULT_NEARBY_LIMIT if limit is None else min(max(limit, 1), MAX_NEARBY_LIMIT)
+
+    radius = min(NEARBY_START_RADIUS_KM, max_radius)
+    while True:
+        box = geohash.bounding_box(latitude, longitude, radius)
+        if bbox is not None:
+            box = (max(box[0], bbox[0]), max(box[1], bbox[1]), min(box[2], bbox[2]), min(box[3], bbox[3]))
+        hotels = _hotels_within(latitude, longitude, box, radius, limit)
+        # Anything outside this circle is farther than what was found
+        if len(hotels) >= limit or radius >= max_radius:
+            break
+        radius = min(radius * NEARBY_GROWTH, max_radius)
+
+    for hotel in hotels:
+        hotel.distance_km = round(hotel.distance_km, 3)
+    return hotels
@@ -1,8 +1,12 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from .models import Hotel, Room, Booking, Payment
+from .availability import is_room_available
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, min_length=8)
@@ -11,21 +15,26 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'password')
         extra_kwargs = {
+            # Uniqueness is checked for username and email together in validate()
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'required': True, 'allow_blank': False},
             'first_name': {'required': False, 'allow_blank': True},
             'last_name': {'required': False, 'allow_blank': True}
         }
 
-    def validate_username(self, value):
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Username already exists.")
-        return value
-
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Email already exists.")
-        return value
-
     def validate(self, attrs):
+        taken = User.objects.filter(
+            Q(username=attrs['username']) | Q(email=attrs['email'])
+        ).values_list('username', 'email')
+        errors = {}
+        for username, email in taken:
+            if username == attrs['username']:
+                errors['username'] = ["Username already exists."]
+            if email == attrs['email']:
+                errors['email'] = ["Email already exists."]
+        if errors:
+            raise serializers.ValidationError(errors)
+
         try:
             validate_password(attrs['password'])
         except ValidationError as e:
@@ -34,15 +43,18 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', '')
-        )
-        user.set_password(validated_data['password'])
-        user.save()
-        return user
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    first_name=validated_data.get('first_name', ''),
+                    last_name=validated_data.get('last_name', '')
+                )
+        except IntegrityError:
+            # Lost a race with a concurrent registration of the same username
+            raise serializers.ValidationError({"username": ["Username already exists."]})
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -54,12 +66,31 @@ class HotelSerializer(serializers.ModelSerializer):
         model = Hotel
         fields = '__all__'
 
+class HotelSearchSerializer(HotelSerializer):
+    # Cheapest room matching the search filters
+    price_per_night = serializers.DecimalField(source='min_price', max_digits=10, decimal_places=2, read_only=True)
+
+class HotelNearbySerializer(HotelSerializer):
+    # Great-circle distance from the search point (set by nearby_hotels)
+    distance_km = serializers.FloatField(read_only=True)
+
+class HotelSuggestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hotel
+        fields = ['id', 'name', 'location', 'rating']
+
 class RoomSerializer(serializers.ModelSerializer):
     available = serializers.BooleanField(source='availability', read_only=True)
 
     class Meta:
         model = Room
-        fields = ['id', 'hotel', 'room_type', 'price_per_night', 'available', 'capacity', 'amenities', 'image']
+        fields = ['id', 'hotel', 'room_type', 'price_per_night', 'available', 'capacity', 'amenities', 'image', 'included_guests', 'extra_guest_fee']
+
+class HotelWithRoomsSerializer(HotelSerializer):
+    rooms = RoomSerializer(many=True, read_only=True)
+
+class HotelSearchWithRoomsSerializer(HotelSearchSerializer):
+    rooms = RoomSerializer(many=True, read_only=True)
 
 class BookingSerializer(serializers.ModelSerializer):
     hotel_name = serializers.CharField(source='room.hotel.name', read_only=True)
@@ -69,8 +100,38 @@ class BookingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Booking
-        fields = ['id', 'room', 'hotel_name', 'hotel_location', 'hotel_image', 'room_type', 'check_in', 'check_out', 'guests', 'total_price', 'status', 'created_at']
-        read_only_fields = ['user', 'hotel_name', 'hotel_location', 'hotel_image', 'room_type']
+        fields = ['id', 'room', 'hotel_name', 'hotel_location', 'hotel_image', 'room_type', 'check_in', 'check_out', 'guests', 'total_price', 'status', 'payment_status', 'created_at']
+        read_only_fields = ['user', 'hotel_name', 'hotel_location', 'hotel_image', 'room_type', 'total_price', 'payment_status']
+
+    def validate(self, attrs):
+        room = attrs.get('room', getattr(self.instance, 'room', None))
+        check_in = attrs.get('check_in', getattr(self.instance, 'check_in', None))
+        check_out = attrs.get('check_out', getattr(self.instance, 'check_out', None))
+
+        if check_in and check_out and check_out <= check_in:
+            raise serializers.ValidationError({"check_out": "Check-out must be after check-in."})
+
+        if room is not None and check_in and check_out:
+            if not room.availability:
+                raise serializers.ValidationError({"room": "Room is not open for booking."})
+            if not is_room_available(room, check_in, check_out, exclude_booking=self.instance):
+                raise serializers.ValidationError({"room": "Room is already booked for these dates."})
+
+        return attrs
+
+class StaySerializer(serializers.Serializer):
+    """
+    One room stay, as used by bulk booking and price quotes.
+    """
+    room = serializers.IntegerField()
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    guests = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, attrs):
+        if attrs['check_out'] <= attrs['check_in']:
+            raise serializers.ValidationError({"check_out": "Check-out must be after check-in."})
+        return attrs
 
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
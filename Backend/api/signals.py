@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import amenities, cache, fulltext
+from .authentication import forget_user_state
+from .inventory import sync_bookings
+from .models import Booking, Hotel, Room
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_delete, sender=Hotel)
+def invalidate_hotel(sender, instance, **kwargs):
+    cache.bump('hotels', f'hotel:{instance.pk}')
+
+
+@receiver(post_save, sender=Hotel)
+@receiver(post_delete, sender=Hotel)
+def sync_hotel_search(sender, instance, update_fields=None, **kwargs):
+    # Saves that touch none of the indexed columns (e.g. rating) leave it alone
+    if update_fields is None or set(update_fields) & set(fulltext.FTS_COLUMNS):
+        fulltext.sync_hotels([instance.pk])
+
+
+@receiver(post_save, sender=Hotel)
+def sync_hotel_amenities(sender, instance, update_fields=None, **kwargs):
+    # Deleting a hotel removes its links through the foreign key cascade
+    if update_fields is None or 'amenities' in update_fields:
+        amenities.sync_hotels([instance])
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def invalidate_room(sender, instance, **kwargs):
+    cache.bump('rooms', f'room:{instance.pk}')
+
+
+@receiver(post_save, sender=Room)
+def sync_room_amenities(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'amenities' in update_fields:
+        amenities.sync_rooms([instance])
+
+
+@receiver(post_save, sender=Booking)
+def sync_booking_inventory(sender, instance, raw=False, **kwargs):
+    # Deleting a booking removes its nights through the foreign key cascade
+    if not raw:
+        sync_bookings([instance])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_token_user(sender, instance, **kwargs):
+    # Token-user mode re-reads is_active/is_staff on the next request
+    forget_user_state(instance.pk)
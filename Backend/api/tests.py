@@ -1,3 +1,1309 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from . import amenities, analytics, cache, fulltext, geohash, jobs, profiling
+from .renderers import FastJSONRenderer
+from .rows import projection
+from .availability import available_room_ids, is_room_available
+from .dbstats import connection_stats
+from .gateways import FakeGateway
+from .models import Hotel, Room, Booking, Payment, RoomNight, SeasonalRate, StayDiscount, IdempotencyKey, Job, DailyRoomTypeStats, Amenity, HotelAmenity
+from .pricing import quote_stays, weekday_counts
+from .serializers import BookingSerializer, HotelSearchSerializer, HotelSerializer, RoomSerializer
+from .search import search_hotels
+
+
+class AuthTests(TestCase):
+    payload = {'username': 'guest', 'email': 'guest@example.com', 'password': 'Secret-pass-123'}
+
+    def test_both_register_endpoints_share_one_path(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/auth/register/', self.payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(response.json()), {'user', 'access', 'refresh'})
+        # One uniqueness check and one INSERT
+        statements = [q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 2)
+
+        response = self.client.post('/api/auth/register/', dict(self.payload, username='other'))
+        self.assertEqual(response.json(), {'email': ['Email already exists.']})
+        response = self.client.post('/api/register/', dict(self.payload, email='other@example.com'))
+        self.assertEqual(response.json(), {'error': 'username: Username already exists.'})
+
+        response = self.client.post('/api/register/', dict(self.payload, username='other', email='other@example.com'))
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get(username='other').password.startswith('scrypt$'))
+
+    def test_login_upgrades_legacy_hash(self):
+        user = User.objects.create(username='guest', password=make_password('Secret-pass-123', hasher='pbkdf2_sha1'))
+        response = self.client.post('/api/auth/login/', {'username': 'guest', 'password': 'Secret-pass-123'})
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+        self.assertTrue(user.check_password('Secret-pass-123'))
+
+
+@override_settings(AUTH_TOKEN_USER=True)
+class TokenUserTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username='guest', email='guest@example.com', password='Secret-pass-123')
+        access = self.client.post('/api/auth/login/', {'username': 'guest', 'password': 'Secret-pass-123'}).json()['access']
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+    def test_served_from_claims(self):
+        self.client.get('/api/auth/user/', **self.auth)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/user/', **self.auth)
+        self.assertEqual(response.json(), {
+            'id': self.user.pk, 'username': 'guest', 'email': 'guest@example.com',
+            'first_name': '', 'last_name': '', 'is_staff': False,
+        })
+        room = Room.objects.create(
+            hotel=Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL'),
+            room_type='Double', price_per_night=100,
+        )
+        response = self.client.post('/api/bookings/', {
+            'room': room.pk, 'check_in': '2025-12-01', 'check_out': '2025-12-03',
+        }, **self.auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.get().user, self.user)
+        self.assertEqual(len(self.client.get('/api/bookings/', **self.auth).json()), 1)
+
+    def test_deactivation_and_demotion_apply_before_token_expiry(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/cache/stats/', **self.auth).status_code, 200)
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/cache/stats/', **self.auth).status_code, 403)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/user/', **self.auth).status_code, 401)
+
+    def test_tokens_without_claims_fall_back_to_database(self):
+        legacy = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/auth/user/', **legacy).json()['username'], 'guest')
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=100)
+        self.other = Room.objects.create(hotel=self.hotel, room_type='Suite', price_per_night=250)
+        Booking.objects.create(
+            user=self.user, room=self.room,
+            check_in=date(2025, 12, 3), check_out=date(2025, 12, 7),
+        )
+
+    def test_overlap_is_half_open(self):
+        self.assertFalse(is_room_available(self.room, date(2025, 12, 6), date(2025, 12, 8)))
+        self.assertTrue(is_room_available(self.room, date(2025, 12, 7), date(2025, 12, 9)))
+        self.assertTrue(is_room_available(self.room, date(2025, 12, 1), date(2025, 12, 3)))
+
+    def test_cancelled_booking_frees_room(self):
+        booking = Booking.objects.get()
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertTrue(is_room_available(self.room, date(2025, 12, 4), date(2025, 12, 5)))
+
+    def test_many_rooms_in_one_query(self):
+        with self.assertNumQueries(1):
+            free = available_room_ids([self.room.id, self.other.id], date(2025, 12, 4), date(2025, 12, 5))
+        self.assertEqual(free, {self.other.id})
+
+    def test_room_can_be_booked_for_disjoint_dates(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/bookings/', {
+            'room': self.room.id, 'check_in': '2026-03-01', 'check_out': '2026-03-04', 'guests': 2,
+        })
+        self.assertEqual(response.status_code, 201)
+        response = client.post('/api/bookings/', {
+            'room': self.room.id, 'check_in': '2026-03-02', 'check_out': '2026-03-03', 'guests': 1,
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_availability_endpoint(self):
+        response = APIClient().get('/api/rooms/availability/', {
+            'rooms': f'{self.room.id},{self.other.id}', 'check_in': '2025-12-05', 'check_out': '2025-12-06',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['availability'], {str(self.room.id): False, str(self.other.id): True})
+
+
+class HotelSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.miami = Hotel.objects.create(
+            name='Harbor Inn', description='', location='Miami, FL', rating=4.2, amenities=['WiFi', 'Pool'],
+        )
+        self.aspen = Hotel.objects.create(
+            name='Mountain Lodge', description='', location='Aspen, CO', rating=4.7, amenities=['WiFi', 'Spa'],
+        )
+        self.miami_room = Room.objects.create(hotel=self.miami, room_type='Double', price_per_night=120, capacity=2)
+        Room.objects.create(hotel=self.aspen, room_type='Suite', price_per_night=300, capacity=4)
+        Hotel.objects.create(name='Empty Hotel', description='', location='Miami, FL', rating=5)
+
+    def search(self, **params):
+        response = APIClient().get('/api/hotels/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [hotel['name'] for hotel in response.data['results']]
+
+    def test_default_sort_is_rating_and_skips_hotels_without_rooms(self):
+        self.assertEqual(self.search(), ['Mountain Lodge', 'Harbor Inn'])
+
+    def test_filters(self):
+        self.assertEqual(self.search(location='miami'), ['Harbor Inn'])
+        self.assertEqual(self.search(q='mount'), ['Mountain Lodge'])
+        self.assertEqual(self.search(amenities='Spa'), ['Mountain Lodge'])
+        self.assertEqual(self.search(guests=3), ['Mountain Lodge'])
+        self.assertEqual(self.search(max_price=200, sort_by='price'), ['Harbor Inn'])
+
+    def test_date_availability(self):
+        Booking.objects.create(
+            user=self.user, room=self.miami_room, check_in=date(2025, 12, 3), check_out=date(2025, 12, 7),
+        )
+        self.assertEqual(self.search(check_in='2025-12-04', check_out='2025-12-05'), ['Mountain Lodge'])
+
+    def test_cursor_pagination(self):
+        response = APIClient().get('/api/hotels/search/', {'page_size': 1, 'sort_by': 'price'})
+        self.assertEqual(response.data['results'][0]['price_per_night'], '120.00')
+        response = APIClient().get(response.data['next'])
+        self.assertEqual([h['name'] for h in response.data['results']], ['Mountain Lodge'])
+
+    def test_invalid_params(self):
+        response = APIClient().get('/api/hotels/search/', {'sort_by': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        for value in ('abc', 'inf', '-Infinity', 'NaN', 'sNaN'):
+            with self.subTest(min_price=value):
+                response = APIClient().get('/api/hotels/search/', {'min_price': value})
+                self.assertEqual(response.status_code, 400)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.harbor = Hotel.objects.create(
+            name='Harbor Inn', description='Rooms over the marina.', location='Miami, FL', rating=4.2,
+        )
+        Hotel.objects.create(
+            name='Seaside Hotel', description='A short walk from the harbor.', location='Miami, FL', rating=4.9,
+        )
+        Hotel.objects.create(
+            name='Mountain Lodge', description='', location='Aspen, CO', address='1 Ridge Road', rating=4.7,
+        )
+
+    def suggest(self, q):
+        response = APIClient().get('/api/hotels/suggest/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [hotel['name'] for hotel in response.data]
+
+    def test_ranked_prefix_matches(self):
+        self.assertEqual(self.suggest('harb'), ['Harbor Inn', 'Seaside Hotel'])
+        self.assertEqual(self.suggest('harbor in'), ['Harbor Inn'])
+        self.assertEqual(self.suggest('ridge'), ['Mountain Lodge'])
+        self.assertEqual(self.suggest('MIAMI fl'), ['Harbor Inn', 'Seaside Hotel'])
+        self.assertEqual(self.suggest('h'), [])
+        self.assertEqual(self.suggest('"near" OR *'), [])
+
+    def test_name_matches_outside_the_rank_window(self):
+        Hotel.objects.bulk_create([
+            Hotel(name=f'Quay Hotel {i}', description='Views of the harbor.', location='Miami, FL') for i in range(5)
+        ])
+        fulltext.rebuild()
+        best = Hotel.objects.create(name='Harbor View', description='', location='Boston, MA')
+        with mock.patch.object(fulltext, 'RANK_WINDOW', 3):
+            self.assertEqual(fulltext.ranked_ids('harb', limit=3)[:2], [best.pk, self.harbor.pk])
+            self.assertEqual(len(fulltext.ranked_ids('harb', limit=4)), 4)
+
+    def test_index_follows_writes(self):
+        self.harbor.name = 'Bayfront Inn'
+        self.harbor.save()
+        self.assertEqual(self.suggest('bayf'), ['Bayfront Inn'])
+        self.assertEqual(self.suggest('harb'), ['Seaside Hotel'])
+        self.harbor.delete()
+        self.assertEqual(self.suggest('inn'), [])
+
+        Hotel.objects.bulk_create([Hotel(name='Canyon Camp', description='', location='Moab, UT')])
+        self.assertEqual(fulltext.ranked_ids('canyon'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.suggest('canyon'), ['Canyon Camp'])
+
+
+class AmenityIndexTests(TestCase):
+    def setUp(self):
+        self.spa = Hotel.objects.create(
+            name='Spa Resort', description='', location='Napa, CA', amenities=['Pool', 'Spa', 'Free  WiFi'],
+        )
+        self.pool = Hotel.objects.create(name='Pool House', description='', location='Napa, CA', amenities=['pool'])
+        Room.objects.create(hotel=self.spa, room_type='Suite', price_per_night=300, amenities=['Balcony', 'TV'])
+        Room.objects.create(hotel=self.pool, room_type='Double', price_per_night=100, amenities=['TV'])
+
+    def hotels(self, *names):
+        return sorted(amenities.filter_by_amenities(Hotel.objects.all(), names).values_list('name', flat=True))
+
+    def test_all_amenities_must_match(self):
+        self.assertEqual(Amenity.objects.get(key='free wifi').name, 'Free WiFi')
+        self.assertEqual(self.hotels('POOL'), ['Pool House', 'Spa Resort'])
+        self.assertEqual(self.hotels('Pool', 'spa'), ['Spa Resort'])
+        self.assertEqual(self.hotels('pool', 'Sauna'), [])
+        self.assertEqual(self.hotels(), ['Pool House', 'Spa Resort'])
+
+    def test_search_filters(self):
+        response = APIClient().get('/api/hotels/search/', {'amenities': 'pool,free wifi'})
+        self.assertEqual([hotel['name'] for hotel in response.data['results']], ['Spa Resort'])
+        response = APIClient().get('/api/hotels/search/', {'room_amenities': 'balcony'})
+        self.assertEqual([hotel['name'] for hotel in response.data['results']], ['Spa Resort'])
+
+    def test_links_follow_writes(self):
+        self.pool.amenities = ['Spa']
+        self.pool.save()
+        self.assertEqual(self.hotels('spa'), ['Pool House', 'Spa Resort'])
+
+        HotelAmenity.objects.all().delete()
+        call_command('rebuild_amenity_index', stdout=StringIO())
+        self.assertEqual(self.hotels('spa'), ['Pool House', 'Spa Resort'])
+
+
+class GeoSearchTests(TestCase):
+    def setUp(self):
+        self.miami = Hotel.objects.create(
+            name='Downtown Miami', description='', location='Miami, FL', latitude=25.7617, longitude=-80.1918,
+        )
+        Hotel.objects.create(
+            name='South Beach', description='', location='Miami Beach, FL', latitude=25.7907, longitude=-80.1300,
+        )
+        Hotel.objects.create(
+            name='Las Olas', description='', location='Fort Lauderdale, FL', latitude=26.1224, longitude=-80.1373,
+        )
+        Hotel.objects.create(
+            name='Midtown', description='', location='New York, NY', latitude=40.7549, longitude=-73.9840,
+        )
+        Hotel.objects.create(name='Unmapped', description='', location='Miami, FL')
+
+    def nearby(self, **params):
+        response = APIClient().get('/api/hotels/nearby/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(hotel['name'], hotel['distance_km']) for hotel in response.data]
+
+    def test_geohash(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(self.miami.geohash, geohash.encode(25.7617, -80.1918))
+        cells = geohash.covering_cells(*geohash.bounding_box(25.7617, -80.1918, 10))
+        self.assertLessEqual(len(cells), geohash.MAX_CELLS)
+        self.assertTrue(any(self.miami.geohash.startswith(cell) for cell in cells))
+
+    def test_radius_search_sorted_by_distance(self):
+        results = self.nearby(lat=25.7617, lng=-80.1918, radius_km=10)
+        self.assertEqual([name for name, _ in results], ['Downtown Miami', 'South Beach'])
+        self.assertEqual(results[0][1], 0)
+        self.assertAlmostEqual(results[1][1], 6.9, delta=0.2)
+        self.assertEqual(len(self.nearby(lat=25.7617, lng=-80.1918, radius_km=50)), 3)
+        self.assertEqual(self.nearby(lat=25.7617, lng=-80.1918, radius_km=50, limit=1)[0][0], 'Downtown Miami')
+
+    def test_bbox_search(self):
+        results = self.nearby(bbox='25.9,-80.3,26.5,-80.0')
+        self.assertEqual([name for name, _ in results], ['Las Olas'])
+        results = self.nearby(bbox='24,-82,41,-73', lat=40.7, lng=-74)
+        self.assertEqual([name for name, _ in results][:2], ['Midtown', 'Las Olas'])
+
+    def test_radius_is_great_circle_distance(self):
+        # 482 km away but only 472 km by flat-earth distance at 60N
+        Hotel.objects.create(name='Kalmar', description='', location='Sweden', latitude=57, longitude=16)
+        self.assertEqual(self.nearby(lat=60, lng=10, radius_km=475), [])
+        self.assertEqual(self.nearby(lat=60, lng=10, radius_km=490), [('Kalmar', 482.149)])
+
+    def test_coordinates_follow_saves(self):
+        self.miami.latitude, self.miami.longitude = 40.7128, -74.0060
+        self.miami.save(update_fields=['latitude', 'longitude'])
+        self.miami.refresh_from_db()
+        self.assertEqual(self.miami.geohash, geohash.encode(40.7128, -74.0060))
+        self.assertEqual(self.nearby(lat=40.7128, lng=-74.0060, radius_km=1), [('Downtown Miami', 0)])
+
+    def test_invalid_params(self):
+        client = APIClient()
+        for params in ({}, {'lat': 25}, {'lat': 95, 'lng': 0}, {'lat': 25, 'lng': -80, 'radius_km': 9999},
+                       {'bbox': '26,-80,25,-81'}):
+            self.assertEqual(client.get('/api/hotels/nearby/', params).status_code, 400, params)
+
+    def test_geocode_backfill(self):
+        Hotel.objects.create(
+            name='Ocean Drive', description='', location='Florida', address='456 Ocean Drive, Miami, FL 33139',
+        )
+        Hotel.objects.create(name='Atlantis', description='', location='Under the sea')
+        out = StringIO()
+        call_command('geocode_hotels', stdout=out)
+        self.assertIn('Geocoded 2 hotels (1 unmatched)', out.getvalue())
+        self.assertEqual(
+            [name for name, _ in self.nearby(lat=25.7617, lng=-80.1918, radius_km=1)],
+            ['Downtown Miami', 'Unmapped', 'Ocean Drive'],
+        )
+
+
+class QueryCountTests(TestCase):
+    """
+    List endpoints must issue a fixed number of queries regardless of how
+    many rows they return.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.staff = User.objects.create_user(username='staff', password='secret-pass-123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.add_rows(1)
+
+    def add_rows(self, count):
+        for i in range(count):
+            hotel = Hotel.objects.create(name=f'Hotel {Hotel.objects.count()}', description='', location='Miami, FL')
+            room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+            Booking.objects.create(
+                user=self.user, room=room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3),
+            )
+
+    def count_queries(self, url, client=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, client=None):
+        small = self.count_queries(url, client)
+        self.add_rows(5)
+        self.assertEqual(self.count_queries(url, client), small)
+
+    def test_hotel_list(self):
+        self.assertConstantQueries('/api/hotels/')
+
+    def test_hotel_search(self):
+        self.assertConstantQueries('/api/hotels/search/')
+
+    def test_room_list(self):
+        self.assertConstantQueries('/api/rooms/')
+
+    def test_booking_list(self):
+        self.assertConstantQueries('/api/bookings/')
+
+    def test_booking_detail(self):
+        booking = Booking.objects.first()
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/bookings/{booking.id}/')
+
+    def test_admin_changelists(self):
+        client = APIClient()
+        client.force_login(self.staff)
+        User.objects.filter(pk=self.staff.pk).update(is_superuser=True)
+        for model in ('room', 'booking'):
+            with self.subTest(model=model):
+                self.assertConstantQueries(f'/admin/api/{model}/', client)
+
+
+class RoomFilterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.other_hotel = Hotel.objects.create(name='Mountain Lodge', description='', location='Aspen, CO')
+        self.double = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=120, capacity=2)
+        self.suite = Room.objects.create(hotel=self.hotel, room_type='Suite', price_per_night=300, capacity=4)
+        Room.objects.create(hotel=self.other_hotel, room_type='Cabin', price_per_night=200, capacity=4)
+        Booking.objects.create(
+            user=self.user, room=self.suite, check_in=date(2025, 12, 3), check_out=date(2025, 12, 7),
+        )
+
+    def room_types(self, **params):
+        response = APIClient().get('/api/rooms/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(room['room_type'] for room in response.data)
+
+    def test_filters(self):
+        self.assertEqual(self.room_types(hotel=self.hotel.id), ['Double', 'Suite'])
+        self.assertEqual(self.room_types(hotel=self.hotel.id, guests=3), ['Suite'])
+        self.assertEqual(self.room_types(min_price=150, max_price=250), ['Cabin'])
+        self.assertEqual(
+            self.room_types(hotel=self.hotel.id, check_in='2025-12-05', check_out='2025-12-06'), ['Double'],
+        )
+
+    def test_invalid_hotel(self):
+        self.assertEqual(APIClient().get('/api/rooms/', {'hotel': 'x'}).status_code, 400)
+        self.assertEqual(APIClient().get('/api/rooms/', {'min_price': 'NaN'}).status_code, 400)
+
+    def test_hotel_detail_expands_rooms(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/hotels/{self.hotel.id}/', {'expand': 'rooms', 'guests': 3})
+        self.assertEqual([room['room_type'] for room in response.data['rooms']], ['Suite'])
+        self.assertNotIn('rooms', client.get(f'/api/hotels/{self.hotel.id}/').data)
+
+
+class CatalogueCacheTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        cache.stats.reset()
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=120)
+
+    def test_hit_skips_database(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/hotels/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = client.get('/api/hotels/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data[0]['name'], 'Harbor Inn')
+        self.assertEqual(cache.stats.as_dict()['hits'], 1)
+
+    def test_hotel_write_invalidates_hotel_entries_only(self):
+        client = APIClient()
+        client.get('/api/hotels/')
+        client.get(f'/api/rooms/{self.room.id}/')
+        self.hotel.name = 'Harbor Hotel'
+        self.hotel.save()
+        response = client.get('/api/hotels/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['name'], 'Harbor Hotel')
+        self.assertEqual(client.get(f'/api/rooms/{self.room.id}/')['X-Cache'], 'HIT')
+
+    def test_room_delete_invalidates_room_list(self):
+        client = APIClient()
+        self.assertEqual(len(client.get('/api/rooms/', {'hotel': self.hotel.id}).data), 1)
+        self.room.delete()
+        self.assertEqual(client.get('/api/rooms/', {'hotel': self.hotel.id}).data, [])
+
+    def test_write_bumps_again_on_commit(self):
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.name = 'Harbor Hotel'
+            self.hotel.save()
+            # Cached before the write commits, as a concurrent reader would
+            self.assertEqual(client.get('/api/hotels/')['X-Cache'], 'MISS')
+            self.assertEqual(client.get('/api/hotels/')['X-Cache'], 'HIT')
+        self.assertEqual(client.get('/api/hotels/')['X-Cache'], 'MISS')
+
+    def test_local_memory_is_per_process(self):
+        self.assertFalse(cache.is_shared())
+
+    def test_date_filtered_requests_bypass_cache(self):
+        params = {'check_in': '2025-12-01', 'check_out': '2025-12-02'}
+        APIClient().get('/api/rooms/', params)
+        response = APIClient().get('/api/rooms/', params)
+        self.assertNotIn('X-Cache', response)
+        self.assertEqual(cache.stats.as_dict()['bypassed'], 2)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        # As with Redis; local memory gives each worker its own tokens
+        self.enterContext(mock.patch.object(cache, 'is_shared', return_value=True))
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=120)
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3),
+        )
+
+    def assertRevalidates(self, url, change):
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(len(ctx.captured_queries), 1)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_hotel_list(self):
+        self.assertRevalidates('/api/hotels/', lambda: Hotel.objects.create(name='New', description='', location='X'))
+
+    def test_hotel_detail(self):
+        def rename():
+            self.hotel.name = 'Harbor Hotel'
+            self.hotel.save()
+        self.assertRevalidates(f'/api/hotels/{self.hotel.id}/', rename)
+
+    def test_booking_list(self):
+        def confirm():
+            self.booking.status = 'confirmed'
+            self.booking.save()
+        self.assertRevalidates('/api/bookings/', confirm)
+
+    def test_booking_list_is_per_user(self):
+        etag = self.client.get('/api/bookings/')['ETag']
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='other', password='secret-pass-123'))
+        self.assertEqual(other.get('/api/bookings/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_no_etags_from_a_per_process_cache(self):
+        self.enterContext(mock.patch.object(cache, 'is_shared', return_value=False))
+        for url in ('/api/hotels/', f'/api/hotels/{self.hotel.id}/', '/api/bookings/'):
+            with self.subTest(url=url):
+                self.assertNotIn('ETag', self.client.get(url))
+
+    def test_wildcard_needs_an_existing_object(self):
+        self.assertEqual(self.client.get(f'/api/hotels/{self.hotel.id}/', HTTP_IF_NONE_MATCH='*').status_code, 304)
+        self.assertEqual(self.client.get('/api/hotels/0/', HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+
+class BookingCreateTests(TestCase):
+    # Concurrency is exercised by `manage.py booking_race`, which needs a
+    # file-backed or server database rather than the in-memory test DB
+
+    def test_booking_is_written_once_with_price_and_payment(self):
+        user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=120)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/bookings/', {
+            'room': room.id, 'check_in': '2026-03-01', 'check_out': '2026-03-04', 'guests': 2,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_price'], '360.00')
+        self.assertEqual(Booking.objects.get().payment.amount, 360)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {'room': self.room.pk, 'check_in': '2025-12-01', 'check_out': '2025-12-03'}
+
+    def post(self, path, data, key):
+        return self.client.post(path, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_booking_and_payment(self):
+        first = self.post('/api/bookings/', self.payload, 'booking-1')
+        retry = self.post('/api/bookings/', self.payload, 'booking-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual((Booking.objects.count(), Payment.objects.count()), (1, 1))
+
+        confirm = {'booking_id': first.json()['id'], 'amount': '200.00'}
+        self.assertEqual(self.post('/api/payments/confirm/', confirm, 'pay-1').status_code, 202)
+        Payment.objects.update(status='refunded')
+        self.assertEqual(self.post('/api/payments/confirm/', confirm, 'pay-1').status_code, 202)
+        self.assertEqual(Payment.objects.get().status, 'refunded')
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_key_reused_for_other_request(self):
+        self.post('/api/bookings/', self.payload, 'booking-1')
+        other = self.post('/api/bookings/', dict(self.payload, check_in='2025-12-05', check_out='2025-12-06'), 'booking-1')
+        self.assertEqual(other.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_in_flight_and_abandoned_requests(self):
+        # As if the first request were still running
+        self.post('/api/bookings/', self.payload, 'booking-1')
+        Booking.objects.all().delete()
+        IdempotencyKey.objects.update(status_code=None, response=None)
+        self.assertEqual(self.post('/api/bookings/', self.payload, 'booking-1').status_code, 409)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.post('/api/bookings/', self.payload, 'booking-1').status_code, 201)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_purge_expired(self):
+        self.post('/api/bookings/', self.payload, 'booking-1')
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class PaymentQueueTests(TestCase):
+    def setUp(self):
+        FakeGateway._charges.clear()
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+        self.booking = Booking.objects.create(
+            user=self.user, room=room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3), total_price=200,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def confirm(self):
+        return self.client.post('/api/payments/confirm/', {'booking_id': self.booking.pk, 'amount': '200.00'}, format='json')
+
+    def test_confirmation_runs_in_background(self):
+        response = self.confirm()
+        self.assertEqual((response.status_code, response.json()['status']), (202, 'processing'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.payment_status, 'processing')
+
+        self.assertEqual(jobs.work(burst=True), 1)
+        self.booking.refresh_from_db()
+        payment = Payment.objects.get()
+        self.assertEqual((self.booking.status, self.booking.payment_status), ('confirmed', 'paid'))
+        self.assertEqual(payment.status, 'completed')
+        self.assertTrue(payment.transaction_id.startswith('ch_fake_'))
+        self.assertEqual(self.confirm().status_code, 200)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_amount_must_match_booking_total(self):
+        for amount in ('0.01', 'abc', 'NaN', ['200']):
+            with self.subTest(amount=amount):
+                response = self.client.post(
+                    '/api/payments/confirm/', {'booking_id': self.booking.pk, 'amount': amount}, format='json',
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Payment.objects.exists())
+        response = self.client.post('/api/payments/confirm/', {'booking_id': self.booking.pk}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Payment.objects.get().amount, 200)
+
+    def test_confirm_changes_booking_list_etag(self):
+        self.enterContext(mock.patch.object(cache, 'is_shared', return_value=True))
+        response = self.client.get('/api/bookings/')
+        self.assertEqual(response.json()[0]['payment_status'], 'unpaid')
+        self.assertEqual(self.confirm().status_code, 202)
+        response = self.client.get('/api/bookings/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['payment_status'], 'processing')
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.confirm()
+        self.assertEqual(Payment.objects.get().status, 'completed')
+
+    @override_settings(PAYMENT_GATEWAY_OPTIONS={'failure_rate': 1.0}, JOBS_MAX_ATTEMPTS=2)
+    def test_gateway_failures_retry_with_backoff(self):
+        self.confirm()
+        jobs.work(burst=True)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('GatewayError', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+        Job.objects.update(run_at=timezone.now())
+        jobs.work(burst=True)
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertEqual(Payment.objects.get().status, 'failed')
+
+    @override_settings(PAYMENT_GATEWAY_OPTIONS={'decline_rate': 1.0})
+    def test_declines_are_not_retried(self):
+        self.confirm()
+        jobs.work(burst=True)
+        self.assertEqual((Job.objects.get().status, Job.objects.get().attempts), (Job.FAILED, 1))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.payment_status, 'failed')
+
+    @override_settings(PAYMENT_GATEWAY_OPTIONS={'webhook_secret': 'whsec'})
+    def test_signed_webhooks(self):
+        Payment.objects.create(booking=self.booking, amount=200, payment_method='card', transaction_id='ch_1', status='completed')
+        body = json.dumps({'type': 'charge.refunded', 'transaction_id': 'ch_1'}).encode()
+        client = APIClient()
+        response = client.post('/api/payments/webhook/', body, content_type='application/json', HTTP_FAKE_SIGNATURE='bad')
+        self.assertEqual(response.status_code, 400)
+
+        signature = FakeGateway(webhook_secret='whsec').sign(body)
+        response = client.post('/api/payments/webhook/', body, content_type='application/json', HTTP_FAKE_SIGNATURE=signature)
+        self.assertEqual(response.status_code, 202)
+        jobs.work(burst=True)
+        self.assertEqual(Payment.objects.get().status, 'refunded')
+
+    @override_settings(PAYMENT_GATEWAY_OPTIONS={'webhook_secret': ''})
+    def test_webhooks_rejected_without_secret(self):
+        body = json.dumps({'type': 'charge.refunded', 'transaction_id': 'ch_1'}).encode()
+        response = APIClient().post('/api/payments/webhook/', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.exists())
+
+
+class BulkBookingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='corp', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.rooms = [
+            Room.objects.create(hotel=hotel, room_type=f'Room {i}', price_per_night=100) for i in range(5)
+        ]
+        Booking.objects.create(
+            user=self.user, room=self.rooms[0], check_in=date(2026, 5, 1), check_out=date(2026, 5, 5),
+        )
+
+    def items(self, rooms):
+        return [{'room': room.id, 'check_in': '2026-05-02', 'check_out': '2026-05-04', 'guests': 2} for room in rooms]
+
+    def test_all_or_nothing_writes_nothing_on_conflict(self):
+        response = self.client.post(
+            '/api/bookings/bulk/', {'bookings': self.items(self.rooms)}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][0]['status'], 'error')
+        self.assertEqual(response.data['results'][1]['status'], 'skipped')
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_best_effort_creates_the_rest(self):
+        response = self.client.post(
+            '/api/bookings/bulk/', {'mode': 'best_effort', 'bookings': self.items(self.rooms)}, format='json',
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(response.data['results'][1]['booking']['total_price'], '200.00')
+        self.assertEqual(Booking.objects.count(), 5)
+        self.assertEqual(Payment.objects.count(), 4)
+
+    def test_items_in_one_batch_cannot_overlap(self):
+        response = self.client.post(
+            '/api/bookings/bulk/', {'mode': 'best_effort', 'bookings': self.items([self.rooms[1]] * 2)}, format='json',
+        )
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error'])
+
+    def test_rejects_non_object_body(self):
+        response = self.client.post('/api/bookings/bulk/', self.items(self.rooms), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_query_count_is_independent_of_batch_size(self):
+        counts = []
+        for rooms in (self.rooms[1:2], self.rooms[2:]):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/bookings/bulk/', {'bookings': self.items(rooms)}, format='json')
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(
+            hotel=self.hotel, room_type='Double', price_per_night=100, included_guests=2, extra_guest_fee=20,
+        )
+
+    def quote(self, check_in, check_out, guests=2):
+        return quote_stays([{'room': self.room.id, 'check_in': check_in, 'check_out': check_out, 'guests': guests}])[0]
+
+    def test_weekday_counts(self):
+        # Mon 2026-06-01 .. Thu 2026-06-11: ten nights
+        self.assertEqual(weekday_counts(date(2026, 6, 1), date(2026, 6, 11)), [2, 2, 2, 1, 1, 1, 1])
+
+    def test_base_rate(self):
+        self.assertEqual(self.quote(date(2026, 6, 1), date(2026, 6, 4))['total'], 300)
+
+    def test_seasonal_weekend_and_guest_surcharge(self):
+        # Weekend nights (Fri, Sat) cost 1.5x; June is high season at 1.2x
+        SeasonalRate.objects.create(hotel=self.hotel, weekdays=0b0110000, multiplier='1.5')
+        SeasonalRate.objects.create(
+            hotel=self.hotel, room=self.room, start_date=date(2026, 6, 1), end_date=date(2026, 7, 1), multiplier='1.2',
+        )
+        # Thu 2026-05-28 .. Tue 2026-06-02: Thu, Fri, Sat, Sun outside June, Mon in June
+        quote = self.quote(date(2026, 5, 28), date(2026, 6, 2), guests=3)
+        self.assertEqual(quote['base'], 100 + 150 + 150 + 100 + 120)
+        self.assertEqual(quote['guest_surcharge'], 5 * 20)
+
+    def test_length_of_stay_discount(self):
+        StayDiscount.objects.create(hotel=self.hotel, min_nights=3, percent=10)
+        StayDiscount.objects.create(hotel=self.hotel, min_nights=7, percent=20)
+        self.assertEqual(self.quote(date(2026, 6, 1), date(2026, 6, 4))['total'], 270)
+        self.assertEqual(self.quote(date(2026, 6, 1), date(2026, 6, 8))['total'], 560)
+
+    def test_many_quotes_in_constant_queries(self):
+        stays = [
+            {'room': self.room.id, 'check_in': date(2026, 6, 1), 'check_out': date(2026, 6, 1 + n), 'guests': 2}
+            for n in range(1, 29)
+        ]
+        with self.assertNumQueries(3):
+            self.assertEqual(len(quote_stays(stays)), 28)
+
+    def test_quote_endpoint(self):
+        response = APIClient().get('/api/rooms/quote/', {
+            'rooms': self.room.id, 'check_in': '2026-06-01', 'check_out': '2026-06-03', 'guests': 4,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['quotes'][0]['total'], '280.00')
+
+    def test_quote_endpoint_rejects_malformed_stays(self):
+        response = APIClient().post('/api/rooms/quote/', {'stays': [1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data['errors'][0])
+        response = APIClient().post('/api/rooms/quote/', [1], format='json')
+        self.assertEqual(response.status_code, 400)
+        response = APIClient().get('/api/rooms/quote/', {'rooms': self.room.id, 'check_in': '2026-06-01'})
+        self.assertIn('check_out', response.data['errors'][0])
+
+
+class InventoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+        self.other = Room.objects.create(hotel=hotel, room_type='Suite', price_per_night=200)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def nights(self):
+        return sorted(RoomNight.objects.values_list('room_id', 'night'))
+
+    def test_follows_booking_lifecycle(self):
+        response = self.client.post('/api/bookings/', {
+            'room': self.room.id, 'check_in': '2025-12-03', 'check_out': '2025-12-05', 'guests': 1,
+        })
+        booking_id = response.data['id']
+        self.assertEqual(self.nights(), [(self.room.id, date(2025, 12, 3)), (self.room.id, date(2025, 12, 4))])
+
+        self.client.patch(f'/api/bookings/{booking_id}/', {'room': self.other.id, 'check_out': '2025-12-04'})
+        self.assertEqual(self.nights(), [(self.other.id, date(2025, 12, 3))])
+
+        self.client.patch(f'/api/bookings/{booking_id}/', {'status': 'cancelled'})
+        self.assertEqual(self.nights(), [])
+
+        self.client.patch(f'/api/bookings/{booking_id}/', {'status': 'confirmed'})
+        self.client.delete(f'/api/bookings/{booking_id}/')
+        self.assertEqual(self.nights(), [])
+
+    def test_date_changes_reprice(self):
+        response = self.client.post('/api/bookings/', {
+            'room': self.room.id, 'check_in': '2025-12-03', 'check_out': '2025-12-05', 'guests': 1,
+        })
+        booking_id = response.data['id']
+        self.assertEqual(response.data['total_price'], '200.00')
+
+        response = self.client.patch(f'/api/bookings/{booking_id}/', {'check_out': '2025-12-12', 'total_price': 1})
+        self.assertEqual(response.data['total_price'], '900.00')
+        self.assertEqual(RoomNight.objects.filter(booking_id=booking_id).count(), 9)
+        response = self.client.patch(f'/api/bookings/{booking_id}/', {'room': self.other.id})
+        self.assertEqual(response.data['total_price'], '1800.00')
+
+    def test_update_rechecks_availability_under_lock(self):
+        booking = Booking.objects.create(
+            user=self.user, room=self.room, check_in=date(2025, 12, 3), check_out=date(2025, 12, 5),
+        )
+        Booking.objects.create(user=self.user, room=self.other, check_in=date(2025, 12, 1), check_out=date(2025, 12, 4))
+        # The serializer's own check passes, as a concurrent writer would see
+        with mock.patch('api.serializers.is_room_available', return_value=True):
+            response = self.client.patch(f'/api/bookings/{booking.id}/', {'room': self.other.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('room', response.data)
+
+    def test_bulk_bookings_fill_inventory(self):
+        self.client.post('/api/bookings/bulk/', {'bookings': [
+            {'room': self.room.id, 'check_in': '2025-12-03', 'check_out': '2025-12-06'},
+            {'room': self.other.id, 'check_in': '2025-12-03', 'check_out': '2025-12-04'},
+        ]}, format='json')
+        self.assertEqual(RoomNight.objects.count(), 4)
+
+    def test_rebuild(self):
+        Booking.objects.create(user=self.user, room=self.room, check_in=date(2025, 12, 3), check_out=date(2025, 12, 6))
+        # A legacy overlap: its nights on 12-04 and 12-05 are already taken
+        overlap = Booking(user=self.user, room=self.room, check_in=date(2025, 12, 4), check_out=date(2025, 12, 7))
+        Booking.objects.bulk_create([overlap])
+        RoomNight.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_inventory', stdout=out)
+        self.assertEqual(RoomNight.objects.count(), 4)
+        self.assertIn('Wrote 4 room-nights', out.getvalue())
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.staff = User.objects.create_user(username='staff', password='secret-pass-123', is_staff=True)
+        self.hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        other = Hotel.objects.create(name='Mountain Lodge', description='', location='Aspen, CO')
+        double = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=100)
+        suite = Room.objects.create(hotel=self.hotel, room_type='Suite', price_per_night=300)
+        cabin = Room.objects.create(hotel=other, room_type='Double', price_per_night=90)
+        Booking.objects.create(
+            user=user, room=double, check_in=date(2025, 12, 3), check_out=date(2025, 12, 5),
+            total_price=Decimal('200.01'), payment_status='paid',
+        )
+        Booking.objects.create(
+            user=user, room=suite, check_in=date(2025, 12, 4), check_out=date(2025, 12, 5), total_price=300,
+        )
+        Booking.objects.create(
+            user=user, room=cabin, check_in=date(2025, 12, 4), check_out=date(2025, 12, 5), total_price=90,
+            status='cancelled',
+        )
+        self.start, self.end = date(2025, 12, 1), date(2025, 12, 11)
+
+    def test_revenue_is_split_over_nights(self):
+        self.assertEqual(
+            sorted(RoomNight.objects.values_list('night', 'revenue')),
+            [(date(2025, 12, 3), Decimal('100.00')), (date(2025, 12, 4), Decimal('100.01')),
+             (date(2025, 12, 4), Decimal('300.00'))],
+        )
+
+    def test_report_by_hotel(self):
+        with self.assertNumQueries(2):
+            report = analytics.report(self.start, self.end, 'hotel')
+        harbor, lodge = report['rows']
+        self.assertEqual(harbor['hotel_name'], 'Harbor Inn')
+        self.assertEqual(
+            (harbor['room_nights_available'], harbor['room_nights_sold'], harbor['occupancy']), (20, 3, 0.15)
+        )
+        self.assertEqual(
+            (harbor['revenue'], harbor['paid_revenue'], harbor['adr'], harbor['revpar']),
+            (Decimal('500.01'), Decimal('200.01'), Decimal('166.67'), Decimal('25.00')),
+        )
+        self.assertEqual((lodge['room_nights_sold'], lodge['occupancy'], lodge['adr']), (0, 0, None))
+        self.assertEqual((report['totals']['room_nights_available'], report['totals']['room_nights_sold']), (30, 3))
+
+    def test_report_by_room_type_and_day(self):
+        by_type = analytics.report(self.start, self.end, 'room_type')
+        self.assertEqual(
+            [(row['room_type'], row['rooms'], row['room_nights_sold']) for row in by_type['rows']],
+            [('Double', 2, 2), ('Suite', 1, 1)],
+        )
+        by_day = analytics.report(self.start, self.end, 'day', hotel=self.hotel.pk)
+        self.assertEqual(
+            [(row['date'], row['occupancy'], row['revenue']) for row in by_day['rows']],
+            [(date(2025, 12, 3), 0.5, Decimal('100.00')), (date(2025, 12, 4), 1.0, Decimal('400.01'))],
+        )
+
+    def test_rollup_matches_live(self):
+        call_command('rollup_analytics', stdout=StringIO())
+        self.assertEqual(DailyRoomTypeStats.objects.count(), 3)
+        for group_by in analytics.GROUPINGS:
+            live = analytics.report(self.start, self.end, group_by)
+            rollup = analytics.report(self.start, self.end, group_by, source='rollup')
+            self.assertEqual((rollup['rows'], rollup['totals']), (live['rows'], live['totals']))
+
+    def test_endpoint_is_staff_only(self):
+        client = APIClient()
+        url = '/api/analytics/?start=2025-12-01&end=2025-12-11&group_by=room_type'
+        self.assertEqual(client.get(url).status_code, 401)
+        client.force_authenticate(self.staff)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['room_nights_sold'], 3)
+        self.assertEqual(client.get('/api/analytics/?group_by=week').status_code, 400)
+        self.assertEqual(client.get('/api/analytics/?start=2025-12-11&end=2025-12-01').status_code, 400)
+
+
+class CatalogueImportTests(TestCase):
+    def write_feed(self, suffix, content):
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False)
+        handle.write(content)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_upserts_and_deletes_in_batches(self):
+        hotels = self.write_feed('.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'external_id': 'H1', 'name': 'Harbor Inn', 'location': 'Miami, FL', 'rating': 4.2,
+             'rooms': [{'room_type': 'Double', 'price_per_night': 120}]},
+            {'external_id': 'H2', 'name': 'Mountain Lodge', 'location': 'Aspen, CO'},
+        ]))
+        rooms = self.write_feed('.csv', (
+            'external_id,hotel_external_id,room_type,price_per_night,capacity,amenities\n'
+            'H1/Double,H1,Double,130,2,WiFi|TV\n'
+            'C1,H2,Cabin,99,3,\n'
+        ))
+        call_command('import_catalogue', hotels=hotels, rooms=rooms, batch_size=1, stdout=StringIO())
+        self.assertEqual(Hotel.objects.count(), 2)
+        double = Room.objects.get(external_id='H1/Double')
+        self.assertEqual((double.price_per_night, double.amenities), (130, ['WiFi', 'TV']))
+
+        delta = self.write_feed('.jsonl', json.dumps({'external_id': 'H2', 'deleted': True}))
+        call_command('import_catalogue', hotels=delta, stdout=StringIO())
+        self.assertEqual(list(Hotel.objects.values_list('external_id', flat=True)), ['H1'])
+        self.assertEqual(Room.objects.count(), 1)
+
+    def test_booked_rows_are_closed_not_deleted(self):
+        hotel = Hotel.objects.create(external_id='H1', name='Harbor Inn', description='', location='Miami, FL')
+        room = Room.objects.create(hotel=hotel, external_id='R1', room_type='Double', price_per_night=100)
+        Room.objects.create(hotel=hotel, external_id='R2', room_type='Suite', price_per_night=200)
+        user = User.objects.create_user(username='guest', password='secret-pass-123')
+        booking = Booking.objects.create(user=user, room=room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3))
+        Payment.objects.create(booking=booking, amount=200, payment_method='card')
+
+        rooms = self.write_feed('.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'external_id': 'R1', 'deleted': True}, {'external_id': 'R2', 'deleted': True},
+        ]))
+        out = StringIO()
+        call_command('import_catalogue', rooms=rooms, stdout=out)
+        self.assertIn('1 deleted, 1 skipped', out.getvalue())
+        self.assertEqual(list(Room.objects.values_list('external_id', 'availability')), [('R1', False)])
+
+        hotels = self.write_feed('.jsonl', json.dumps({'external_id': 'H1', 'deleted': True}))
+        call_command('import_catalogue', hotels=hotels, stdout=StringIO())
+        self.assertTrue(Hotel.objects.filter(external_id='H1').exists())
+        self.assertTrue(Payment.objects.filter(booking=booking).exists())
+
+    def test_counts_and_skips_malformed_rows(self):
+        hotels = self.write_feed('.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'external_id': 'H1', 'name': 'Harbor Inn', 'location': 'Miami, FL'},
+            {'external_id': 'H1', 'name': 'Harbor Inn & Spa', 'location': 'Miami, FL'},
+        ]))
+        rooms = self.write_feed('.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'external_id': 'R1', 'room_type': 'Double', 'price_per_night': 100},
+            {'external_id': 'R2', 'hotel_external_id': 'H1', 'room_type': 'Suite', 'price_per_night': 200},
+        ]))
+        out = StringIO()
+        call_command('import_catalogue', hotels=hotels, rooms=rooms, stdout=out)
+        self.assertIn('1 hotels, 1 rooms upserted, 0 deleted, 1 skipped', out.getvalue())
+        self.assertEqual(Hotel.objects.get().name, 'Harbor Inn & Spa')
+
+    def test_bad_values_skip_only_their_row(self):
+        hotels = self.write_feed('.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'external_id': 'H1', 'name': 'Harbor Inn', 'location': 'Miami, FL', 'latitude': 25.8, 'longitude': -80.2,
+             'rooms': [{'room_type': 'Double', 'price_per_night': 'n/a'}, {'room_type': 'Suite', 'price_per_night': 200}]},
+            {'external_id': 'H2', 'name': 'Nowhere', 'location': 'X', 'latitude': 95, 'longitude': 0},
+            {'external_id': 'H3', 'name': 'Unrated', 'location': 'X', 'rating': 'five'},
+        ]))
+        rooms = self.write_feed('.csv', (
+            'external_id,hotel_external_id,room_type,price_per_night,capacity\n'
+            'R1,H1,Cabin,99,two\n'
+            'R2,H1,Loft,NaN,2\n'
+        ))
+        out = StringIO()
+        call_command('import_catalogue', hotels=hotels, rooms=rooms, stdout=out)
+        self.assertIn('1 hotels, 1 rooms upserted, 0 deleted, 5 skipped', out.getvalue())
+        self.assertEqual(list(Room.objects.values_list('room_type', flat=True)), ['Suite'])
+
+
+class BenchmarkDataTests(TestCase):
+    def test_generates_consistent_dataset(self):
+        options = {'hotels': 5, 'rooms_per_hotel': 2, 'users': 3, 'bookings': 25, 'stdout': StringIO()}
+        call_command('generate_benchmark_data', **options)
+        self.assertEqual((Hotel.objects.count(), Room.objects.count(), Booking.objects.count()), (5, 10, 25))
+        self.assertEqual(Payment.objects.count(), 25)
+        self.assertTrue(User.objects.get(username='bench-staff').is_staff)
+        self.assertTrue(User.objects.get(username='bench-user-0').check_password('bench-pass-123'))
+        nights = sum((b.check_out - b.check_in).days for b in Booking.objects.all())
+        self.assertEqual(RoomNight.objects.count(), nights)
+
+        with self.assertRaises(CommandError):
+            call_command('generate_benchmark_data', **options)
+        call_command('generate_benchmark_data', flush=True, **options)
+        self.assertEqual(Booking.objects.count(), 25)
+
+
+class RowSerializationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(
+            name='Harbor Inn', description='Café by the bay', location='Miami, FL', rating=4.5,
+            amenities=['WiFi', 'Pool'], images=['a.jpg'], latitude=25.77, longitude=-80.19,
+        )
+        Hotel.objects.create(name='Bare Hotel', description='', location='Aspen, CO')
+        room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=Decimal('120.5'), extra_guest_fee=15)
+        Booking.objects.create(
+            user=self.user, room=room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3),
+            total_price=Decimal('241'), created_at=timezone.now().replace(microsecond=123456),
+        )
+
+    def test_rows_match_serializers(self):
+        cases = [
+            (HotelSerializer, Hotel.objects.order_by('id')),
+            (RoomSerializer, Room.objects.order_by('id')),
+            (BookingSerializer, Booking.objects.select_related('room__hotel').order_by('id')),
+            (HotelSearchSerializer, search_hotels({}).order_by('id')),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                rows = projection(serializer_class)
+                self.assertEqual(rows.serialize(rows.values(queryset)), serializer_class(queryset, many=True).data)
+
+    def test_renderer_matches_json_renderer(self):
+        data = BookingSerializer(Booking.objects.all(), many=True).data + [
+            {'when': timezone.now(), 'day': date(2025, 12, 1), 'price': Decimal('1.50'), 1: 'x', 'big': 2 ** 70},
+        ]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+    def test_list_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/hotels/')
+        self.assertEqual(response.json(), HotelSerializer(Hotel.objects.all(), many=True).data)
+        self.assertEqual(client.get('/api/bookings/').json()[0]['total_price'], '241.00')
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.hotel = Hotel.objects.create(
+            name='Harbor Inn', description='Long text', location='Miami, FL', rating=4.5, images=['a.jpg'],
+        )
+        self.room = Room.objects.create(hotel=self.hotel, room_type='Double', price_per_night=120, capacity=2)
+        Room.objects.create(hotel=self.hotel, room_type='Suite', price_per_night=300, capacity=4)
+        other = Hotel.objects.create(name='Mountain Lodge', description='', location='Aspen, CO', rating=4.7)
+        Room.objects.create(hotel=other, room_type='Cabin', price_per_night=90)
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room, check_in=date(2025, 12, 1), check_out=date(2025, 12, 3),
+        )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), ' '.join(query['sql'] for query in ctx.captured_queries)
+
+    def test_fields_are_selected_in_sql(self):
+        data, sql = self.get('/api/hotels/', {'fields': 'name,id,rating'})
+        self.assertEqual(data[0], {'id': self.hotel.id, 'name': 'Harbor Inn', 'rating': 4.5})
+        self.assertNotIn('description', sql)
+
+        data, sql = self.get(f'/api/hotels/{self.hotel.id}/', {'exclude': 'description,images'})
+        self.assertNotIn('description', data)
+        self.assertIn('address', data)
+        self.assertNotIn('"description"', sql)
+
+        data, sql = self.get(f'/api/rooms/{self.room.id}/', {'fields': 'price_per_night,available'})
+        self.assertEqual(data, {'price_per_night': '120.00', 'available': True})
+        self.assertNotIn('"room_type"', sql)
+
+    def test_related_fields(self):
+        with self.assertNumQueries(1):
+            data, sql = self.get(f'/api/bookings/{self.booking.id}/', {'fields': 'hotel_name,check_in'})
+        self.assertEqual(data, {'hotel_name': 'Harbor Inn', 'check_in': '2025-12-01'})
+        self.assertNotIn('"description"', sql)
+        data, _ = self.get('/api/bookings/', {'fields': 'id,room_type'})
+        self.assertEqual(data, [{'id': self.booking.id, 'room_type': 'Double'}])
+
+    def test_search_pages_without_the_ordering_field(self):
+        data, _ = self.get('/api/hotels/search/', {'fields': 'name', 'sort_by': 'price', 'page_size': 1})
+        self.assertEqual(data['results'], [{'name': 'Mountain Lodge'}])
+        response = self.client.get(data['next'])
+        self.assertEqual(response.json()['results'], [{'name': 'Harbor Inn'}])
+
+    def test_expand_rooms(self):
+        data, _ = self.get('/api/hotels/', {'expand': 'rooms', 'fields': 'name,rooms', 'guests': 3})
+        self.assertEqual(data[0]['name'], 'Harbor Inn')
+        self.assertEqual([room['room_type'] for room in data[0]['rooms']], ['Suite'])
+        self.assertEqual(data[1]['rooms'], [])
+        with self.assertNumQueries(1):
+            data, _ = self.get('/api/hotels/', {'expand': 'rooms', 'fields': 'name'})
+        self.assertEqual(data[0], {'name': 'Harbor Inn'})
+        data, _ = self.get('/api/hotels/search/', {'expand': 'rooms', 'max_price': 150, 'exclude': 'description'})
+        self.assertEqual(
+            {hotel['name']: [room['id'] for room in hotel['rooms']] for hotel in data['results']},
+            {'Harbor Inn': [self.room.id], 'Mountain Lodge': [Room.objects.get(room_type='Cabin').id]},
+        )
+
+    def test_invalid_params(self):
+        for url, params in [
+            ('/api/hotels/', {'fields': 'name,bogus'}),
+            ('/api/hotels/', {'fields': 'rooms'}),
+            ('/api/hotels/', {'expand': 'bookings'}),
+            ('/api/hotels/', {'fields': ''}),
+            ('/api/rooms/', {'fields': 'id', 'exclude': 'id'}),
+            (f'/api/bookings/{self.booking.id}/', {'exclude': 'user'}),
+            ('/api/async/hotels/', {'fields': 'bogus'}),
+        ]:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_async_lists(self):
+        params = {'fields': 'id,name', 'exclude': 'id'}
+        self.assertEqual(self.client.get('/api/async/hotels/', params).json(), self.get('/api/hotels/', params)[0])
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='secret-pass-123')
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        self.room = Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+        Booking.objects.create(user=self.user, room=self.room, check_in=date(2025, 12, 3), check_out=date(2025, 12, 5))
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def test_matches_sync_payloads(self):
+        client = APIClient()
+        for path in ('hotels/', f'rooms/?hotel={self.room.hotel_id}'):
+            with self.subTest(path=path):
+                self.assertEqual(client.get(f'/api/async/{path}').json(), client.get(f'/api/{path}').json())
+        self.assertEqual(
+            client.get('/api/async/bookings/', **self.auth).json(), client.get('/api/bookings/', **self.auth).json(),
+        )
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/api/async/bookings/').status_code, 401)
+        self.assertEqual(self.client.get(f'/api/async/hotels/{self.room.hotel_id}/').status_code, 401)
+
+    def test_read_only(self):
+        for path in ('hotels/', f'hotels/{self.room.hotel_id}/', 'rooms/', 'bookings/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.post(f'/api/async/{path}', **self.auth).status_code, 405)
+                self.assertEqual(self.client.head(f'/api/async/{path}', **self.auth).status_code, 200)
+
+
+class DatabaseStatsTests(TestCase):
+    def setUp(self):
+        connection_stats.reset()
+
+    def test_acquire_timings(self):
+        connection_stats.record(0.002)
+        connection_stats.record(0.004)
+        self.assertEqual(connection_stats.as_dict(), {'acquisitions': 2, 'avg_ms': 3.0, 'max_ms': 4.0})
+
+    def test_staff_only_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='guest', password='secret-pass-123'))
+        self.assertEqual(client.get('/api/db/stats/').status_code, 403)
+        client.force_authenticate(User.objects.create_user(username='staff', password='secret-pass-123', is_staff=True))
+        response = client.get('/api/db/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['vendor'], response.data['pool']), ('sqlite', None))
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_QUERY_MS=0)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        profiling.stats.reset()
+        hotel = Hotel.objects.create(name='Harbor Inn', description='', location='Miami, FL')
+        Room.objects.create(hotel=hotel, room_type='Double', price_per_night=100)
+        self.staff = User.objects.create_user(username='staff', password='secret-pass-123', is_staff=True)
+
+    def test_records_request_profile(self):
+        client = APIClient()
+        with self.assertLogs('api.profiling', 'WARNING') as logs:
+            response = client.get('/api/rooms/')
+        profile = profiling.stats.as_dict()['GET api/rooms/']
+        self.assertEqual(profile['requests'], 1)
+        self.assertEqual(profile['avg_bytes'], len(response.content))
+        self.assertGreaterEqual(profile['avg_queries'], 1)
+        self.assertGreater(profile['avg_serializer_ms'], 0)
+        self.assertIn('api/', logs.output[0])
+
+    def test_staff_endpoint_formats(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        with self.assertLogs('api.profiling', 'WARNING'):
+            client.get('/api/hotels/')
+            data = client.get('/api/profiling/stats/').json()
+            text = client.get('/api/profiling/stats/?output=prometheus').content.decode()
+        self.assertTrue(data['enabled'])
+        self.assertEqual(data['endpoints']['GET api/hotels/']['requests'], 1)
+        self.assertIn('stayeasy_http_requests_total{method="GET",route="api/hotels/"} 1', text)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_by_default(self):
+        APIClient().get('/api/hotels/')
+        self.assertEqual(profiling.stats.as_dict(), {})
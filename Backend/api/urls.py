@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import HotelList, HotelDetail, RoomList, RoomDetail, BookingList, BookingDetail, RegisterView, UserView
+from .views import HotelList, HotelSearch, HotelSuggest, HotelNearby, HotelDetail, RoomList, RoomDetail, BookingList, BookingDetail, RegisterView, UserView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from . import views
 
@@ -14,15 +14,27 @@ urlpatterns = [
     path('login/', views.login_view, name="login_view"),
 
     path('hotels/', HotelList.as_view()),
+    path('hotels/search/', HotelSearch.as_view(), name='hotel_search'),
+    path('hotels/suggest/', HotelSuggest.as_view(), name='hotel_suggest'),
+    path('hotels/nearby/', HotelNearby.as_view(), name='hotel_nearby'),
     path('hotels/<int:pk>/', HotelDetail.as_view()),
 
     path('rooms/', RoomList.as_view()),
+    path('rooms/quote/', views.room_quote, name='room_quote'),
+    path('rooms/availability/', views.room_availability, name='room_availability'),
     path('rooms/<int:pk>/', RoomDetail.as_view()),
 
     path('bookings/', BookingList.as_view()),
+    path('bookings/bulk/', views.bulk_create_bookings, name='bulk_create_bookings'),
     path('bookings/<int:pk>/', BookingDetail.as_view()),
 
     # Add payment endpoints
     path('payments/create-intent/', views.create_payment_intent, name='create_payment_intent'),
     path('payments/confirm/', views.confirm_payment, name='confirm_payment'),
+    path('payments/webhook/', views.payment_webhook, name='payment_webhook'),
+
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
+    path('db/stats/', views.db_stats, name='db_stats'),
+    path('profiling/stats/', views.profiling_stats, name='profiling_stats'),
+    path('analytics/', views.analytics_report, name='analytics'),
 ]
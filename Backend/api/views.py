@@ -1,83 +1,446 @@
+import hashlib
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import connection, transaction
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from . import analytics, cache, fulltext, jobs, profiling
+from .authentication import ClaimsRefreshToken
+from .availability import filter_available_rooms, is_room_available
+from .bookings import BULK_MODES, MAX_BULK_BOOKINGS, booking_total, create_bulk_bookings
+from .cache import CatalogueCacheMixin, get_versions
+from .conditional import CatalogueConditionalGetMixin, ConditionalGetMixin
+from .dbstats import database_stats
+from .fieldsets import SparseFieldsetMixin, selected_fields
+from .gateways import GatewayError, InvalidWebhook, get_gateway
+from .idempotency import idempotent
 from .models import Hotel, Room, Booking, Payment
-from .serializers import RegisterSerializer, UserSerializer, HotelSerializer, RoomSerializer, BookingSerializer, PaymentSerializer
+from .pagination import HotelSearchPagination
+from .payments import WEBHOOK_JOB, request_confirmation
+from .pricing import MAX_QUOTES, quote_stays
+from .rows import RowListMixin
+from .search import SearchParamError, filter_rooms, matching_rooms, nearby_hotels, search_hotels
+from .serializers import RegisterSerializer, UserSerializer, HotelSerializer, HotelSearchSerializer, HotelWithRoomsSerializer, HotelSearchWithRoomsSerializer, HotelNearbySerializer, HotelSuggestionSerializer, RoomSerializer, BookingSerializer, StaySerializer, PaymentSerializer
+
+def _query_date(request, name):
+    """
+    Parse an ISO date query parameter, returning None if missing or invalid.
+    """
+    try:
+        return parse_date(request.query_params.get(name) or '')
+    except ValueError:
+        return None
+
+
+def _expand(request):
+    return {f.strip() for f in request.query_params.get('expand', '').split(',') if f.strip()}
+
+
+class SearchParamErrorMixin:
+    """
+    Report invalid filter query params as 400 responses.
+    """
+
+    def handle_exception(self, exc):
+        if isinstance(exc, SearchParamError):
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
+
+
+class HotelRoomsExpansionMixin:
+    """
+    ?expand=rooms nests each hotel's rooms (filtered by the same params as
+    /api/rooms/), loaded with one prefetch query. It is skipped when
+    fields/exclude leave rooms out.
+    """
+    expanded_serializer_class = HotelWithRoomsSerializer
+
+    def expand_rooms(self):
+        if self.request.method != 'GET':
+            return False
+        expand = _expand(self.request)
+        if expand - {'rooms'}:
+            raise SearchParamError("expand must be one of: rooms")
+        if 'rooms' not in expand:
+            return False
+        fields = selected_fields(self.request.query_params, self.expanded_serializer_class)
+        return fields is None or 'rooms' in fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.expand_rooms():
+            rooms = matching_rooms(self.request.query_params).order_by('price_per_night', 'id')
+            queryset = queryset.prefetch_related(Prefetch('rooms', queryset=rooms))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.expand_rooms():
+            return self.expanded_serializer_class
+        return super().get_serializer_class()
+
 
 # Hotels
-class HotelList(generics.ListCreateAPIView):
+class HotelList(SearchParamErrorMixin, CatalogueConditionalGetMixin, CatalogueCacheMixin, HotelRoomsExpansionMixin, RowListMixin, generics.ListCreateAPIView):
+    """
+    Query params: fields, exclude (see api.fieldsets), expand=rooms.
+    """
     queryset = Hotel.objects.all()
     serializer_class = HotelSerializer
     permission_classes = [permissions.AllowAny]
 
-class HotelDetail(generics.RetrieveUpdateDestroyAPIView):
+    def cache_scopes(self):
+        if 'rooms' in _expand(self.request):
+            return ['hotels', 'rooms']
+        return ['hotels']
+
+class HotelSearch(SearchParamErrorMixin, HotelRoomsExpansionMixin, RowListMixin, generics.ListAPIView):
+    """
+    Filtered, cursor-paginated hotel search. Query params: q (full text),
+    location, rating, min_price, max_price, amenities, room_amenities,
+    guests, check_in, check_out, sort_by, fields, exclude, expand=rooms
+    (the matching rooms).
+    """
+    serializer_class = HotelSearchSerializer
+    expanded_serializer_class = HotelSearchWithRoomsSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = HotelSearchPagination
+
+    def get_queryset(self):
+        return search_hotels(self.request.query_params)
+
+class HotelNearby(SearchParamErrorMixin, generics.ListAPIView):
+    """
+    Hotels near a point, nearest first:
+    /api/hotels/nearby/?lat=25.77&lng=-80.19&radius_km=10&limit=20, or
+    ?bbox=min_lat,min_lng,max_lat,max_lng (sorted from lat/lng if given,
+    else from the box centre).
+    """
+    serializer_class = HotelNearbySerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+
+    def get_queryset(self):
+        return nearby_hotels(self.request.query_params)
+
+class HotelSuggest(CatalogueCacheMixin, generics.ListAPIView):
+    """
+    Typeahead: /api/hotels/suggest/?q=harb&limit=10 returns the best
+    full-text matches on name, location, address and description, best first.
+    """
+    serializer_class = HotelSuggestionSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+    max_limit = 25
+
+    def get_queryset(self):
+        try:
+            limit = min(int(self.request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        return fulltext.suggest(self.request.query_params.get('q', ''), max(limit, 1))
+
+    def cache_scopes(self):
+        return ['hotels']
+
+class HotelDetail(SearchParamErrorMixin, CatalogueConditionalGetMixin, CatalogueCacheMixin, HotelRoomsExpansionMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    ?expand=rooms nests the hotel's rooms so the detail page loads in one
+    round trip; fields/exclude trim the response.
+    """
     queryset = Hotel.objects.all()
     serializer_class = HotelSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def cache_scopes(self):
+        scopes = [f"hotel:{self.kwargs['pk']}"]
+        if 'rooms' in _expand(self.request):
+            scopes.append('rooms')
+        return scopes
+
 # Rooms
-class RoomList(generics.ListCreateAPIView):
-    queryset = Room.objects.all()
+class RoomList(SearchParamErrorMixin, CatalogueConditionalGetMixin, CatalogueCacheMixin, RowListMixin, generics.ListCreateAPIView):
+    """
+    Query params: hotel, guests, room_amenities, min_price, max_price,
+    check_in, check_out, fields, exclude.
+    """
     serializer_class = RoomSerializer
 
-class RoomDetail(generics.RetrieveUpdateDestroyAPIView):
+    def get_queryset(self):
+        return filter_rooms(self.request.query_params)
+
+    def cache_scopes(self):
+        return ['rooms']
+
+class RoomDetail(SearchParamErrorMixin, CatalogueConditionalGetMixin, CatalogueCacheMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
 
+    def cache_scopes(self):
+        return [f"room:{self.kwargs['pk']}"]
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def room_availability(request):
+    """
+    Check many rooms for a date range in one query:
+    /api/rooms/availability/?rooms=1,2,3&check_in=YYYY-MM-DD&check_out=YYYY-MM-DD
+    """
+    try:
+        room_ids = [int(pk) for pk in request.query_params.get('rooms', '').split(',') if pk]
+    except ValueError:
+        return Response(
+            {'error': 'rooms must be a comma-separated list of ids'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    check_in = _query_date(request, 'check_in')
+    check_out = _query_date(request, 'check_out')
+    if not check_in or not check_out or check_out <= check_in:
+        return Response(
+            {'error': 'Valid check_in and check_out dates are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    free = set(
+        filter_available_rooms(Room.objects.filter(id__in=room_ids), check_in, check_out)
+        .values_list('id', flat=True)
+    )
+    return Response({
+        'check_in': check_in,
+        'check_out': check_out,
+        'availability': {str(pk): pk in free for pk in room_ids},
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.AllowAny])
+def room_quote(request):
+    """
+    Price many stays in one call.
+    GET  ?rooms=1,2,3&check_in=YYYY-MM-DD&check_out=YYYY-MM-DD&guests=2
+    POST {"stays": [{room, check_in, check_out, guests}, ...]}
+    """
+    if request.method == 'GET':
+        try:
+            room_ids = [int(pk) for pk in request.query_params.get('rooms', '').split(',') if pk]
+        except ValueError:
+            return Response(
+                {'error': 'rooms must be a comma-separated list of ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Missing params are left out so the serializer reports them
+        shared = {
+            key: request.query_params[key] for key in ('check_in', 'check_out', 'guests') if key in request.query_params
+        }
+        stays = [dict(shared, room=pk) for pk in room_ids]
+    else:
+        stays = request.data.get('stays') if isinstance(request.data, dict) else None
+
+    if not isinstance(stays, list) or not stays:
+        return Response(
+            {'error': 'At least one stay is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(stays) > MAX_QUOTES:
+        return Response(
+            {'error': f'At most {MAX_QUOTES} stays per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = StaySerializer(data=stays, many=True)
+    if not serializer.is_valid():
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    quotes = quote_stays(serializer.validated_data)
+    for quote in quotes:
+        for field in ('base', 'guest_surcharge', 'discount', 'total'):
+            if field in quote:
+                quote[field] = str(quote[field])
+    return Response({'quotes': quotes}, status=status.HTTP_200_OK)
+
+
 # Bookings
-class BookingList(generics.ListCreateAPIView):
+class BookingList(SearchParamErrorMixin, ConditionalGetMixin, RowListMixin, generics.ListCreateAPIView):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        return Booking.objects.filter(user_id=self.request.user.pk).select_related('room__hotel')
+
+    def get_etag(self, request):
+        # One aggregate over the user's bookings, plus the catalogue tokens
+        # for the hotel/room fields embedded in each booking, which only
+        # mean the same thing across workers when the cache is shared
+        if not cache.is_shared():
+            return None
+        state = Booking.objects.filter(user_id=request.user.pk).aggregate(last=Max('updated_at'), count=Count('id'))
+        versions = get_versions('hotels', 'rooms')
+        raw = f"{request.user.pk}:{state['count']}:{state['last']}:{':'.join(versions)}:{request.META.get('QUERY_STRING', '')}"
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    @idempotent('bookings.create')
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        booking = serializer.save(user=self.request.user)
-        # Calculate total price
-        from datetime import datetime
-        check_in = datetime.strptime(str(booking.check_in), '%Y-%m-%d').date()
-        check_out = datetime.strptime(str(booking.check_out), '%Y-%m-%d').date()
-        nights = (check_out - check_in).days
-        booking.total_price = booking.room.price_per_night * nights
-        booking.save()
-        # Mark the room as unavailable after booking
-        room = booking.room
-        room.availability = False
-        room.save()
-        # Create a Payment record with default values
-        Payment.objects.create(
-            booking=booking,
-            amount=booking.total_price,
-            payment_method='',
-            status='pending'
+        check_in = serializer.validated_data['check_in']
+        check_out = serializer.validated_data['check_out']
+
+        with transaction.atomic():
+            # Lock the room row so concurrent bookings for it run one at a
+            # time, then re-check availability under the lock
+            room = Room.objects.select_for_update().get(pk=serializer.validated_data['room'].pk)
+            if not is_room_available(room, check_in, check_out):
+                raise ValidationError({'room': 'Room is already booked for these dates.'})
+
+            booking = serializer.save(
+                user_id=self.request.user.pk,
+                room=room,
+                total_price=booking_total(room, check_in, check_out, serializer.validated_data.get('guests', 1)),
+            )
+            # Create a Payment record with default values
+            Payment.objects.create(
+                booking=booking,
+                amount=booking.total_price,
+                payment_method='',
+                status='pending'
+            )
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_create_bookings(request):
+    """
+    Book many rooms in one request:
+    {"mode": "all_or_nothing" | "best_effort", "bookings": [{room, check_in, check_out, guests}, ...]}
+    """
+    if not isinstance(request.data, dict):
+        return Response(
+            {'error': 'Request body must be an object'},
+            status=status.HTTP_400_BAD_REQUEST
         )
+    mode = request.data.get('mode', 'all_or_nothing')
+    items = request.data.get('bookings')
 
-class BookingDetail(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Booking.objects.all()
+    if mode not in BULK_MODES:
+        return Response(
+            {'error': f"mode must be one of: {', '.join(BULK_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'bookings must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > MAX_BULK_BOOKINGS:
+        return Response(
+            {'error': f'At most {MAX_BULK_BOOKINGS} bookings per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = {}
+    valid = []
+    for index, item in enumerate(items):
+        serializer = StaySerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+    if not (mode == 'all_or_nothing' and results):
+        for index, (booking, errors) in create_bulk_bookings(request.user, valid, mode).items():
+            if booking is None:
+                results[index] = {'index': index, 'status': 'error', 'errors': errors}
+            else:
+                results[index] = {'index': index, 'status': 'created', 'booking': BookingSerializer(booking).data}
+
+    ordered = [results.get(index, {'index': index, 'status': 'skipped'}) for index in range(len(items))]
+    created = sum(1 for result in ordered if result['status'] == 'created')
+
+    if created == len(items):
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+
+    return Response({
+        'mode': mode,
+        'created': created,
+        'failed': len(items) - created,
+        'results': ordered,
+    }, status=response_status)
+
+
+class BookingDetail(SearchParamErrorMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Booking.objects.select_related('room__hotel')
     serializer_class = BookingSerializer
 
+    def perform_update(self, serializer):
+        booking = serializer.instance
+        data = serializer.validated_data
+        check_in = data.get('check_in', booking.check_in)
+        check_out = data.get('check_out', booking.check_out)
+        guests = data.get('guests', booking.guests)
+
+        with transaction.atomic():
+            # As in BookingList.perform_create: the room lock serializes
+            # writers of its nights, so re-check availability under it
+            room = Room.objects.select_for_update().get(pk=data.get('room', booking.room).pk)
+            if not is_room_available(room, check_in, check_out, exclude_booking=booking):
+                raise ValidationError({'room': 'Room is already booked for these dates.'})
+
+            extra = {'room': room}
+            # Reprice a changed stay so total_price matches its room nights
+            if any(field in data for field in ('room', 'check_in', 'check_out', 'guests')):
+                extra['total_price'] = booking_total(room, check_in, check_out, guests)
+            serializer.save(**extra)
+
 
 # Authentication
+def _token_response(user, status_code):
+    """
+    The user plus a fresh access/refresh token pair, as returned by
+    registration and login
+    """
+    refresh = ClaimsRefreshToken.for_user(user)
+    return Response({
+        'user': UserSerializer(user).data,
+        'access': str(refresh.access_token),
+        'refresh': str(refresh)
+    }, status=status_code)
+
+
+def _register(request):
+    """
+    Validate and create a user; returns (user, None) or (None, errors)
+    """
+    serializer = RegisterSerializer(data=request.data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    try:
+        return serializer.save(), None
+    except ValidationError as e:
+        return None, e.detail
+
+
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': UserSerializer(user).data,
-                'access': str(refresh.access_token),
-                'refresh': str(refresh)
-            }, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        user, errors = _register(request)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return _token_response(user, status.HTTP_201_CREATED)
 
 
 # Payments
@@ -85,89 +448,171 @@ class RegisterView(APIView):
 @permission_classes([permissions.IsAuthenticated])
 def create_payment_intent(request):
     """
-    Create a payment intent (simplified for demo)
+    Create a payment intent with the configured gateway
     """
-    try:
-        data = request.data
-        amount = data.get('amount')
-
-        if not amount:
-            return Response(
-                {'error': 'Amount is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+    amount = request.data.get('amount')
 
-        # In a real app, you'd integrate with Stripe/PayPal
-        return Response({
-            'client_secret': 'demo_secret_' + str(amount),
-            'amount': amount
-        }, status=status.HTTP_200_OK)
+    if not amount:
+        return Response(
+            {'error': 'Amount is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    except Exception as e:
+    try:
+        intent = get_gateway().create_intent(amount, metadata={'user': request.user.pk})
+    except GatewayError as e:
         return Response(
-            {'error': str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': f'Payment gateway unavailable: {e}'},
+            status=status.HTTP_502_BAD_GATEWAY
         )
 
+    return Response({
+        'id': intent['id'],
+        'client_secret': intent['client_secret'],
+        'amount': intent['amount']
+    }, status=status.HTTP_200_OK)
+
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent('payments.confirm')
 def confirm_payment(request):
     """
-    Confirm payment and update booking/payment status
+    Queue the charge for a booking; a background worker confirms the booking
+    once the gateway accepts it (see Booking.payment_status)
     """
+    data = request.data if isinstance(request.data, dict) else {}
+    booking_id = data.get('booking_id')
+    amount = data.get('amount')
+    payment_method = data.get('payment_method', 'card')
+
+    if not booking_id:
+        return Response(
+            {'error': 'Booking ID is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Get the booking
     try:
-        data = request.data
-        booking_id = data.get('booking_id')
-        amount = data.get('amount')
-        payment_method = data.get('payment_method', 'card')
+        booking = Booking.objects.get(id=booking_id, user_id=request.user.pk)
+    except (Booking.DoesNotExist, ValueError):
+        return Response(
+            {'error': 'Booking not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
 
-        if not booking_id:
+    # The charge is always the booking total; a client-sent amount is only
+    # checked against it
+    if amount is not None:
+        try:
+            amount = Decimal(str(amount))
+        except InvalidOperation:
+            return Response({'error': 'Invalid amount'}, status=status.HTTP_400_BAD_REQUEST)
+        if amount != booking.total_price:
             return Response(
-                {'error': 'Booking ID is required'},
+                {'error': f'Amount must equal the booking total ({booking.total_price})'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get the booking
-        try:
-            booking = Booking.objects.get(id=booking_id, user=request.user)
-        except Booking.DoesNotExist:
-            return Response(
-                {'error': 'Booking not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+    payment = request_confirmation(booking, booking.total_price, payment_method)
 
-        # Update booking status
-        booking.status = 'confirmed'
-        booking.payment_status = 'paid'
-        booking.save()
-
-        # Update or create payment record
-        payment, created = Payment.objects.get_or_create(
-            booking=booking,
-            defaults={
-                'amount': amount,
-                'payment_method': payment_method,
-                'status': 'completed'
-            }
-        )
-        if not created:
-            payment.amount = amount
-            payment.payment_method = payment_method
-            payment.status = 'completed'
-            payment.save()
+    return Response({
+        'message': 'Payment is being processed' if payment.status == 'processing' else 'Payment already completed',
+        'booking_id': booking.id,
+        'payment_id': payment.id,
+        'status': payment.status
+    }, status=status.HTTP_202_ACCEPTED if payment.status == 'processing' else status.HTTP_200_OK)
 
-        return Response({
-            'message': 'Payment confirmed successfully',
-            'booking_id': booking.id,
-            'payment_id': payment.id
-        }, status=status.HTTP_200_OK)
 
-    except Exception as e:
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def payment_webhook(request):
+    """
+    Gateway event callback; verified here and applied by a background worker
+    """
+    try:
+        event = get_gateway().parse_webhook(request.body, request.headers)
+    except InvalidWebhook as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    jobs.enqueue(WEBHOOK_JOB, event)
+    return Response({'received': True}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    """
+    Catalogue cache hit/miss counters for this worker process
+    """
+    return Response(cache.stats.as_dict(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_stats(request):
+    """
+    Database connection settings, acquire timings and pool saturation for
+    this worker process
+    """
+    return Response(database_stats(connection), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def profiling_stats(request):
+    """
+    Per-endpoint request profiles for this worker process, as JSON or, with
+    ?output=prometheus, in the Prometheus text format
+    """
+    if request.query_params.get('output') == 'prometheus':
+        return HttpResponse(profiling.stats.as_prometheus(), content_type='text/plain; version=0.0.4')
+    return Response(
+        {'enabled': settings.PROFILING_ENABLED, 'endpoints': profiling.stats.as_dict()},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def analytics_report(request):
+    """
+    Occupancy, ADR, RevPAR and revenue for nights in [start, end):
+    /api/analytics/?start=YYYY-MM-DD&end=YYYY-MM-DD&group_by=hotel|room_type|day&hotel=<id>&source=live|rollup
+    Defaults to the last 30 days grouped by hotel.
+    """
+    today = timezone.localdate()
+    start = _query_date(request, 'start') if 'start' in request.query_params else today - timedelta(days=30)
+    end = _query_date(request, 'end') if 'end' in request.query_params else today
+    if not start or not end or end <= start:
+        return Response({'error': 'Valid start and end dates are required'}, status=status.HTTP_400_BAD_REQUEST)
+    if (end - start).days > analytics.MAX_RANGE_DAYS:
         return Response(
-            {'error': str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': f'At most {analytics.MAX_RANGE_DAYS} days can be reported at once'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    group_by = request.query_params.get('group_by', 'hotel')
+    if group_by not in analytics.GROUPINGS:
+        return Response(
+            {'error': f"group_by must be one of {', '.join(analytics.GROUPINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    source = request.query_params.get('source', settings.ANALYTICS_SOURCE)
+    if source not in analytics.SOURCES:
+        return Response(
+            {'error': f"source must be one of {', '.join(analytics.SOURCES)}"},
+            status=status.HTTP_400_BAD_REQUEST
         )
+    hotel = request.query_params.get('hotel') or None
+    if hotel is not None and not hotel.isdigit():
+        return Response({'error': 'hotel must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        analytics.report(start, end, group_by, hotel=hotel and int(hotel), source=source),
+        status=status.HTTP_200_OK,
+    )
 
 
 class UserView(APIView):
@@ -190,61 +635,18 @@ class UserView(APIView):
 @permission_classes([permissions.AllowAny])
 def register_view(request):
     """
-    Function-based view for user registration
+    Function-based view for user registration; same as RegisterView but
+    reports the first problem as {'error': ...}
     """
-    try:
-        data = request.data
-        username = data.get('username')
-        email = data.get('email')
-        password = data.get('password')
-        first_name = data.get('first_name', '')
-        last_name = data.get('last_name', '')
-
-        if not all([username, email, password]):
-            return Response(
-                {'error': 'Username, email, and password are required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        if User.objects.filter(username=username).exists():
-            return Response(
-                {'error': 'Username already exists'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        if User.objects.filter(email=email).exists():
-            return Response(
-                {'error': 'Email already exists'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        user = User.objects.create(
-            username=username,
-            email=email,
-            password=make_password(password),
-            first_name=first_name,
-            last_name=last_name
-        )
-
-        refresh = RefreshToken.for_user(user)
-        
-        return Response({
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-            },
-            'access': str(refresh.access_token),
-            'refresh': str(refresh)
-        }, status=status.HTTP_201_CREATED)
-
-    except Exception as e:
+    user, errors = _register(request)
+    if errors:
+        field, messages = next(iter(errors.items()))
+        message = messages[0] if isinstance(messages, list) else messages
         return Response(
-            {'error': str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': f'{field}: {message}' if field != 'non_field_errors' else str(message)},
+            status=status.HTTP_400_BAD_REQUEST
         )
+    return _token_response(user, status.HTTP_201_CREATED)
 
 
 @api_view(['POST'])
@@ -264,6 +666,7 @@ def login_view(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Upgrades the stored hash if PASSWORD_HASHER or its cost changed
         user = authenticate(username=username, password=password)
         
         if user is None:
@@ -272,19 +675,7 @@ def login_view(request):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        refresh = RefreshToken.for_user(user)
-        
-        return Response({
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-            },
-            'access': str(refresh.access_token),
-            'refresh': str(refresh)
-        }, status=status.HTTP_200_OK)
+        return _token_response(user, status.HTTP_200_OK)
 
     except Exception as e:
         return Response(
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""
+API benchmark suite: drives each endpoint of a running server in turn at a
+fixed concurrency and writes throughput, latency percentiles and DB queries
+per request as JSON, so runs can be diffed between releases.
+
+Seed the database and start the server with profiling on (query counts come
+from /api/profiling/stats/, which is per worker, so use a single worker):
+
+    python manage.py generate_benchmark_data --flush --hotels 1000 --bookings 5000
+    PROFILING_ENABLED=true gunicorn stayeasyhotel.wsgi -w 1 --threads 8
+    python benchmarks/api_suite.py http://127.0.0.1:8000 --connections 16 --duration 10 --output before.json
+    python benchmarks/api_suite.py http://127.0.0.1:8000 --connections 16 --duration 10 --baseline before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+from http_load import build_request, run
+
+SAMPLE_SIZE = 200
+CITIES = ('New York', 'Miami', 'Chicago', 'San Francisco', 'Seattle', 'Austin', 'Boston', 'Denver')
+# City centres for the nearby search, as in the bundled gazetteer
+POINTS = ((40.7128, -74.0060), (25.7617, -80.1918), (41.8781, -87.6298), (37.7749, -122.4194))
+
+
+def api(base, method, path, token=None, body=None):
+    request = urllib.request.Request(
+        base + path,
+        method=method,
+        data=None if body is None else json.dumps(body).encode(),
+        headers={'Content-Type': 'application/json', **({'Authorization': f'Bearer {token}'} if token else {})},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def login(base, username, password):
+    return api(base, 'POST', '/api/auth/login/', body={'username': username, 'password': password})['access']
+
+
+def scenarios(ctx):
+    """
+    {name: (profiling route, request factory)}; each factory maps a request
+    counter to (method, path, body).
+    """
+    hotels, rooms, bookings = ctx['hotels'], ctx['rooms'], ctx['bookings']
+    stay_in = date.today() + timedelta(days=60)
+    stay = f'check_in={stay_in}&check_out={stay_in + timedelta(days=2)}'
+    # New bookings go in a far-future window picked per run so reruns do not collide
+    booking_epoch = date.today() + timedelta(days=730 + ctx['rng'].randrange(0, 365 * 50))
+
+    def room_batch(i, size=10):
+        return ','.join(str(rooms[(i + n) % len(rooms)]) for n in range(size))
+
+    def new_booking(i):
+        check_in = booking_epoch + timedelta(days=(i // len(rooms)) * 3)
+        return ('POST', '/api/bookings/', {
+            'room': rooms[i % len(rooms)],
+            'check_in': str(check_in),
+            'check_out': str(check_in + timedelta(days=2)),
+            'guests': 1,
+        })
+
+    return {
+        'hotel_list': ('GET api/hotels/', lambda i: ('GET', '/api/hotels/', None)),
+        'hotel_search': (
+            'GET api/hotels/search/',
+            lambda i: ('GET', f'/api/hotels/search/?location={CITIES[i % len(CITIES)].replace(" ", "+")}'
+                              f'&guests=2&sort_by=price', None),
+        ),
+        'hotel_search_dates': (
+            'GET api/hotels/search/',
+            lambda i: ('GET', f'/api/hotels/search/?location={CITIES[i % len(CITIES)].replace(" ", "+")}&{stay}', None),
+        ),
+        'hotel_nearby': (
+            'GET api/hotels/nearby/',
+            lambda i: ('GET', '/api/hotels/nearby/?lat={:.4f}&lng={:.4f}&radius_km=10'.format(
+                POINTS[i % len(POINTS)][0] + (i % 7 - 3) / 100, POINTS[i % len(POINTS)][1] + (i % 5 - 2) / 100,
+            ), None),
+        ),
+        'hotel_detail': ('GET api/hotels/<int:pk>/', lambda i: ('GET', f'/api/hotels/{hotels[i % len(hotels)]}/', None)),
+        'hotel_detail_rooms': (
+            'GET api/hotels/<int:pk>/',
+            lambda i: ('GET', f'/api/hotels/{hotels[i % len(hotels)]}/?expand=rooms', None),
+        ),
+        'room_list': ('GET api/rooms/', lambda i: ('GET', f'/api/rooms/?hotel={hotels[i % len(hotels)]}&guests=2', None)),
+        'room_detail': ('GET api/rooms/<int:pk>/', lambda i: ('GET', f'/api/rooms/{rooms[i % len(rooms)]}/', None)),
+        'room_availability': (
+            'GET api/rooms/availability/',
+            lambda i: ('GET', f'/api/rooms/availability/?rooms={room_batch(i)}&{stay}', None),
+        ),
+        'room_quote': (
+            'GET api/rooms/quote/',
+            lambda i: ('GET', f'/api/rooms/quote/?rooms={room_batch(i)}&{stay}&guests=2', None),
+        ),
+        'user': ('GET api/auth/user/', lambda i: ('GET', '/api/auth/user/', None)),
+        'booking_list': ('GET api/bookings/', lambda i: ('GET', '/api/bookings/', None)),
+        'booking_create': ('POST api/bookings/', new_booking),
+        'payment_confirm': (
+            'POST api/payments/confirm/',
+            lambda i: ('POST', '/api/payments/confirm/', {
+                'booking_id': bookings[i % len(bookings)], 'amount': '100.00', 'payment_method': 'card',
+            }),
+        ),
+        'login': (
+            'POST api/auth/login/',
+            lambda i: ('POST', '/api/auth/login/', {'username': ctx['username'], 'password': ctx['password']}),
+        ),
+    }
+
+
+def profile_snapshot(base, staff_token):
+    if staff_token is None:
+        return None
+    try:
+        data = api(base, 'GET', '/api/profiling/stats/', token=staff_token)
+    except urllib.error.URLError:
+        return None
+    return data['endpoints'] if data.get('enabled') else None
+
+
+def queries_per_request(before, after, route):
+    if before is None or after is None or route not in after:
+        return None
+    old = before.get(route, {'requests': 0, 'queries': 0})
+    new = after[route]
+    requests = new['requests'] - old['requests']
+    return round((new['queries'] - old['queries']) / requests, 2) if requests else None
+
+
+def compare(baseline, result):
+    """
+    Per-scenario change against a previous run, in percent (queries absolute).
+    """
+    rows = {}
+    for name, current in result['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+
+        def change(key):
+            return round((current[key] - previous[key]) / previous[key] * 100, 1) if previous[key] else None
+
+        rows[name] = {
+            'rps_pct': change('rps'),
+            'p50_pct': change('p50_ms'),
+            'p99_pct': change('p99_ms'),
+            'queries_per_request': [previous.get('queries_per_request'), current.get('queries_per_request')],
+        }
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every API endpoint of a running server')
+    parser.add_argument('base_url', help='Server root, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--connections', type=int, default=16, help='Concurrent keep-alive connections per scenario')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+    parser.add_argument('--username', default='bench-user-0')
+    parser.add_argument('--staff-username', default='bench-staff', help='Staff user for reading query counts')
+    parser.add_argument('--password', default='bench-pass-123')
+    parser.add_argument('--seed', type=int, help='Seed for the booking date window (random by default)')
+    parser.add_argument('--label', help='Label stored with the results (e.g. a release tag)')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    parser.add_argument('--baseline', help='Previous result file to compare against')
+    args = parser.parse_args(argv)
+
+    base = args.base_url.rstrip('/')
+    url = urlsplit(base)
+    if url.scheme != 'http':
+        parser.error('only http:// URLs are supported')
+
+    token = login(base, args.username, args.password)
+    try:
+        staff_token = login(base, args.staff_username, args.password)
+    except urllib.error.HTTPError:
+        staff_token = None
+
+    ctx = {
+        'hotels': [hotel['id'] for hotel in api(base, 'GET', '/api/hotels/')][:SAMPLE_SIZE],
+        'rooms': [room['id'] for room in api(base, 'GET', '/api/rooms/')][:SAMPLE_SIZE],
+        'bookings': [booking['id'] for booking in api(base, 'GET', '/api/bookings/', token=token)][:SAMPLE_SIZE],
+        'username': args.username,
+        'password': args.password,
+        'rng': random.Random(args.seed),
+    }
+    if not (ctx['hotels'] and ctx['rooms'] and ctx['bookings']):
+        parser.error('no data to drive; run "manage.py generate_benchmark_data" first')
+
+    selected = scenarios(ctx)
+    if args.scenario:
+        unknown = set(args.scenario) - set(selected)
+        if unknown:
+            parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+        selected = {name: selected[name] for name in args.scenario}
+
+    headers = [f'Authorization: Bearer {token}']
+    result = {
+        'label': args.label,
+        'base_url': base,
+        'connections': args.connections,
+        'duration_s': args.duration,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'scenarios': {},
+    }
+    for name, (route, make) in selected.items():
+        counter = itertools.count()
+
+        def next_request():
+            method, path, body = make(next(counter))
+            return build_request(url, method, path, headers, body)
+
+        before = profile_snapshot(base, staff_token)
+        stats = asyncio.run(run(url, args.connections, args.duration, headers, next_request))
+        after = profile_snapshot(base, staff_token)
+        stats.pop('url')
+        stats.pop('connections')
+        result['scenarios'][name] = {
+            'route': route,
+            **stats,
+            'queries_per_request': queries_per_request(before, after, route),
+        }
+        print(f'{name:<20} {stats["rps"]:>9} rps  p50 {stats["p50_ms"]:>8} ms  p99 {stats["p99_ms"]:>8} ms',
+              file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            result['comparison'] = compare(json.load(handle), result)
+
+    print(json.dumps(result, indent=2, sort_keys=True))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
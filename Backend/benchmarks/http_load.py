@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Closed-loop HTTP load generator for comparing deployments.
+
+Opens N keep-alive connections and has each one issue GET requests back to
+back for a fixed duration, then prints throughput and latency percentiles as
+JSON. Uses only the standard library so it runs anywhere the backend does.
+
+    python benchmarks/http_load.py http://127.0.0.1:8000/api/hotels/ --connections 1000 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+def build_request(url, method='GET', path=None, headers=(), body=None):
+    """
+    Encode one HTTP/1.1 keep-alive request. `body` is sent as JSON.
+    """
+    if path is None:
+        path = url.path + ('?' + url.query if url.query else '')
+    payload = b'' if body is None else json.dumps(body).encode()
+    head = f'{method} {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: keep-alive\r\n'
+    if body is not None:
+        head += f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+    head += ''.join(f'{header}\r\n' for header in headers) + '\r\n'
+    return head.encode() + payload
+
+
+async def connection_loop(url, next_request, deadline, results):
+    """
+    Issue requests back to back on one connection; `next_request()` returns
+    the encoded bytes of each request.
+    """
+    host, port = url.hostname, url.port or 80
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(next_request())
+            await writer.drain()
+            status, close = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            results['statuses']['error'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        results['latencies'].append(time.perf_counter() - began)
+        results['statuses'][status] += 1
+        if close:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, connections, duration, headers, next_request=None):
+    if next_request is None:
+        request = build_request(url, headers=headers)
+
+        def next_request():
+            return request
+
+    results = {'latencies': [], 'statuses': Counter()}
+    began = time.perf_counter()
+    deadline = began + duration
+    await asyncio.gather(*(connection_loop(url, next_request, deadline, results) for _ in range(connections)))
+    elapsed = time.perf_counter() - began
+    latencies = sorted(results['latencies'])
+    return {
+        'url': url.geturl(),
+        'connections': connections,
+        'duration_s': round(elapsed, 2),
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'statuses': {str(code): count for code, count in results['statuses'].items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Closed-loop HTTP GET load generator')
+    parser.add_argument('url', help='Full URL to request')
+    parser.add_argument('--connections', type=int, default=100, help='Concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run')
+    parser.add_argument('--header', action='append', default=[], help='Extra header, e.g. "Authorization: Bearer ..."')
+    parser.add_argument('--label', help='Label stored with the results (e.g. wsgi, asgi)')
+    parser.add_argument('--output', help='Append the JSON result to this file (one object per line)')
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    if url.scheme != 'http':
+        parser.error('only http:// URLs are supported')
+
+    result = asyncio.run(run(url, args.connections, args.duration, args.header))
+    if args.label:
+        result = {'label': args.label, **result}
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'a') as handle:
+            handle.write(json.dumps(result) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
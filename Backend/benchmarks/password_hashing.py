@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Logins per second per core for each password hasher at the cost configured
+in settings (PASSWORD_* environment variables), measured as single-process
+password checks. Use it to pick PASSWORD_HASHER and its cost:
+
+    python benchmarks/password_hashing.py --iterations 20
+    PASSWORD_SCRYPT_WORK_FACTOR=8192 python benchmarks/password_hashing.py --hasher scrypt
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stayeasyhotel.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils.module_loading import import_string  # noqa: E402
+
+HASHERS = {name: import_string(path) for name, path in settings.PASSWORD_HASHER_CLASSES.items()}
+
+PASSWORD = 'correct horse battery staple'
+
+
+def measure(hasher, iterations):
+    encoded = hasher.encode(PASSWORD, hasher.salt())
+    hasher.verify(PASSWORD, encoded)  # warm up
+    began = time.perf_counter()
+    for _ in range(iterations):
+        hasher.verify(PASSWORD, encoded)
+    elapsed = time.perf_counter() - began
+    return {
+        'hasher': hasher.algorithm,
+        'params': {key: value for key, value in hasher.decode(encoded).items()
+                   if key not in ('algorithm', 'hash', 'salt')},
+        'ms_per_login': round(elapsed / iterations * 1000, 2),
+        'logins_per_sec_per_core': round(iterations / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Password check throughput per hasher')
+    parser.add_argument('--hasher', action='append', choices=sorted(HASHERS), help='Hashers to measure (default: all)')
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.hasher or sorted(HASHERS):
+        try:
+            results.append(measure(HASHERS[name](), args.iterations))
+        except ValueError as e:
+            # e.g. argon2-cffi not installed
+            results.append({'hasher': name, 'error': str(e)})
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
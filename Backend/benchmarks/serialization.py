@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+List serialization cost per 1,000 rows: the ModelSerializer path (model
+instances, serializer.data, JSONRenderer) against the row path used by the
+list endpoints (.values() rows, api.rows, FastJSONRenderer). Each stage is
+timed separately over the first --rows hotels, rooms and bookings of the
+configured database; generate_benchmark_data fills one:
+
+    DB_NAME=/tmp/bench.sqlite3 python benchmarks/serialization.py --rows 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stayeasyhotel.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.models import Booking, Hotel, Room  # noqa: E402
+from api.renderers import FastJSONRenderer  # noqa: E402
+from api.rows import projection  # noqa: E402
+from api.serializers import BookingSerializer, HotelSerializer, RoomSerializer  # noqa: E402
+
+CASES = {
+    'hotels': (HotelSerializer, lambda: Hotel.objects.order_by('id')),
+    'rooms': (RoomSerializer, lambda: Room.objects.order_by('id')),
+    'bookings': (BookingSerializer, lambda: Booking.objects.select_related('room__hotel').order_by('id')),
+}
+
+
+def _serializer_path(serializer_class, queryset):
+    began = time.perf_counter()
+    objects = list(queryset)
+    fetched = time.perf_counter()
+    data = serializer_class(objects, many=True).data
+    serialized = time.perf_counter()
+    body = JSONRenderer().render(data)
+    return len(objects), body, (fetched - began, serialized - fetched, time.perf_counter() - serialized)
+
+
+def _row_path(serializer_class, queryset):
+    rows = projection(serializer_class)
+    began = time.perf_counter()
+    values = list(rows.values(queryset))
+    fetched = time.perf_counter()
+    data = rows.serialize(values)
+    serialized = time.perf_counter()
+    body = FastJSONRenderer().render(data)
+    return len(values), body, (fetched - began, serialized - fetched, time.perf_counter() - serialized)
+
+
+def measure(name, count, repeat):
+    serializer_class, queryset = CASES[name]
+    result = {'count': 0}
+    for path, run in (('serializer', _serializer_path), ('rows', _row_path)):
+        run(serializer_class, queryset()[:count])  # warm up
+        best = None
+        for _ in range(repeat):
+            rows, body, stages = run(serializer_class, queryset()[:count])
+            if best is None or sum(stages) < sum(best):
+                best = stages
+        result['count'] = rows
+        if not rows:
+            break
+        per_1k = 1000 / rows * 1000
+        result[path] = {
+            'fetch_ms': round(best[0] * per_1k, 2),
+            'serialize_ms': round(best[1] * per_1k, 2),
+            'render_ms': round(best[2] * per_1k, 2),
+            'total_ms': round(sum(best) * per_1k, 2),
+            'bytes_per_row': len(body) // rows,
+        }
+    if result['count']:
+        result['speedup'] = round(result['serializer']['total_ms'] / result['rows']['total_ms'], 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List serialization cost per 1,000 rows')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per list (default: 1000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the fastest is reported')
+    parser.add_argument('--model', action='append', choices=sorted(CASES), help='Lists to measure (default: all)')
+    args = parser.parse_args(argv)
+
+    results = {name: measure(name, args.rows, args.repeat) for name in args.model or CASES}
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stayeasyhotel.settings')
 django.setup()
 
+from api import amenities, fulltext
 from api.models import Hotel, Room
 
 def populate_hotels():
@@ -147,15 +148,21 @@ def populate_hotels():
         }
     ]
 
-    # Create hotels and rooms
-    for hotel_data in hotels_data:
-        rooms_data = hotel_data.pop('rooms')
-        hotel = Hotel.objects.create(**hotel_data)
-        
-        for room_data in rooms_data:
-            Room.objects.create(hotel=hotel, **room_data)
-        
-        print(f"Created hotel: {hotel.name} with {len(rooms_data)} rooms")
+    # Create hotels and rooms with one bulk insert each
+    rooms_data = [hotel_data.pop('rooms') for hotel_data in hotels_data]
+    hotels = Hotel.objects.bulk_create([Hotel(**hotel_data) for hotel_data in hotels_data])
+    rooms = Room.objects.bulk_create([
+        Room(hotel=hotel, **room_data)
+        for hotel, hotel_rooms in zip(hotels, rooms_data)
+        for room_data in hotel_rooms
+    ])
+    # bulk_create sends no post_save, so index search text and amenities explicitly
+    fulltext.sync_hotels([hotel.pk for hotel in hotels])
+    amenities.sync_hotels(hotels)
+    amenities.sync_rooms(rooms)
+
+    for hotel, hotel_rooms in zip(hotels, rooms_data):
+        print(f"Created hotel: {hotel.name} with {len(hotel_rooms)} rooms")
 
     print("Database populated successfully!")
 
@@ -1,7 +1,9 @@
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ==============================
 MIDDLEWARE = [
+    "api.profiling.ProfilingMiddleware",   # no-op unless PROFILING_ENABLED
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",   # ✅ must come before auth
     "corsheaders.middleware.CorsMiddleware",
@@ -51,19 +54,66 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request profiling (wall/DB/serializer time, response size); see
+# GET /api/profiling/stats/. Queries slower than PROFILING_SLOW_QUERY_MS are
+# logged with the code that issued them.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SLOW_QUERY_MS = config('PROFILING_SLOW_QUERY_MS', default=100, cast=float)
+
 
 CORS_ALLOW_ALL_ORIGINS = True   # allow React frontend
 CORS_ALLOW_CREDENTIALS = True   # allow cookies/auth headers
 
+# Token-user mode: serve request.user from the access token's claims instead
+# of loading the User row on every request. Account status (active/staff) is
+# cached for TOKEN_USER_CACHE_TTL seconds per worker.
+AUTH_TOKEN_USER = config('AUTH_TOKEN_USER', default=False, cast=bool)
+TOKEN_USER_CACHE_TTL = config('TOKEN_USER_CACHE_TTL', default=30, cast=int)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",  # Allow access by default, override in views
     ),
+    # orjson-backed JSON (see api.renderers); same output as JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
+# Idempotency-Key support on booking/payment POSTs: how long a key's stored
+# response is replayed, how long a retry waits for the first request, and
+# after how long an unfinished first request is considered dead.
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=10, cast=float)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=60, cast=int)
+
+# Payment gateway (dotted path + keyword arguments). FakeGateway simulates
+# latency, transient failures and declines for local runs and load tests.
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='api.gateways.FakeGateway')
+PAYMENT_GATEWAY_OPTIONS = {
+    'latency_ms': config('FAKE_GATEWAY_LATENCY_MS', default=0, cast=int),
+    'failure_rate': config('FAKE_GATEWAY_FAILURE_RATE', default=0.0, cast=float),
+    'decline_rate': config('FAKE_GATEWAY_DECLINE_RATE', default=0.0, cast=float),
+    'webhook_secret': config('PAYMENT_WEBHOOK_SECRET', default=''),
+}
+
+# Background jobs (api.jobs), run by `manage.py run_worker`. With JOBS_EAGER
+# they run inline right after the enqueuing transaction commits instead.
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_BACKOFF_BASE = config('JOBS_BACKOFF_BASE', default=2.0, cast=float)     # seconds
+JOBS_BACKOFF_MAX = config('JOBS_BACKOFF_MAX', default=300.0, cast=float)
+JOBS_LOCK_TIMEOUT = config('JOBS_LOCK_TIMEOUT', default=300, cast=int)
+
+# Default source for /api/analytics/: 'live' aggregates the RoomNight
+# inventory, 'rollup' reads DailyRoomTypeStats as last built by
+# `manage.py rollup_analytics` (much faster for long ranges).
+ANALYTICS_SOURCE = config('ANALYTICS_SOURCE', default='live')
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),   # token expiry
@@ -71,6 +121,35 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Password hashing: PASSWORD_HASHER picks argon2 (needs argon2-cffi), scrypt
+# or pbkdf2, with the cost below. Existing hashes keep verifying and are
+# upgraded to the preferred hasher/cost on the user's next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)   # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=1, cast=int)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1_000_000, cast=int)
+
+PASSWORD_HASHER_CLASSES = {
+    'argon2': 'api.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'api.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'api.hashers.TunedPBKDF2PasswordHasher',
+}
+# Fail at startup rather than on every login
+if PASSWORD_HASHER not in PASSWORD_HASHER_CLASSES:
+    raise ImproperlyConfigured(f"PASSWORD_HASHER must be one of: {', '.join(PASSWORD_HASHER_CLASSES)}")
+if PASSWORD_HASHER == 'argon2' and importlib.util.find_spec('argon2') is None:
+    raise ImproperlyConfigured("PASSWORD_HASHER=argon2 needs the argon2-cffi package")
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
 DATABASES = {
     "default": {
         'ENGINE': config('DB_ENGINE', default='django.db.backends.sqlite3'),
@@ -81,12 +160,63 @@ DATABASES = {
 # Add PostgreSQL-specific settings only if using PostgreSQL
 if config('DB_ENGINE', default='django.db.backends.sqlite3') == 'django.db.backends.postgresql':
     DATABASES['default'].update({
+        # Same as django.db.backends.postgresql, plus connection acquire timings
+        'ENGINE': 'api.db_backends.postgresql',
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT', default='5432'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
+        # Reuse connections across requests instead of reconnecting each time,
+        # checking them before reuse so a dropped connection is replaced
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     })
 
+    # A per-worker psycopg connection pool (requires psycopg[pool]); replaces
+    # persistent connections and is the recommended setup under ASGI
+    if config('DB_POOL', default=False, cast=bool):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+                'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+            },
+        }
+elif config('DB_ENGINE', default='django.db.backends.sqlite3') == 'django.db.backends.sqlite3':
+    # Take the write lock when a transaction starts so concurrent bookings
+    # queue up instead of racing (or failing) on lock upgrade
+    DATABASES['default']['OPTIONS'] = {
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': config('DB_TIMEOUT', default=20, cast=int),
+    }
+
+
+# ==============================
+# CACHES
+# ==============================
+# The catalogue cache holds serialized hotel/room payloads. It defaults to
+# per-process local memory; point it at Redis in production, e.g.
+# CATALOGUE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CATALOGUE_CACHE_LOCATION=redis://127.0.0.1:6379/1
+CATALOGUE_CACHE_BACKEND = config('CATALOGUE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalogue": {
+        "BACKEND": CATALOGUE_CACHE_BACKEND,
+        "LOCATION": config('CATALOGUE_CACHE_LOCATION', default='catalogue'),
+    },
+}
+
+if CATALOGUE_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES["catalogue"]["OPTIONS"] = {"MAX_ENTRIES": config('CATALOGUE_CACHE_MAX_ENTRIES', default=10000, cast=int)}
+
+CATALOGUE_CACHE_TIMEOUT = config('CATALOGUE_CACHE_TIMEOUT', default=300, cast=int)
+
 
 TEMPLATES = [
     {
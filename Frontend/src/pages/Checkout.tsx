@@ -48,7 +48,7 @@ const Checkout: React.FC = () => {
       // Process payment (in a real app, you'd integrate with Stripe/Razorpay)
       const paymentPayload = {
         booking_id: bookingResponse.data.id,
-        amount: bookingData.totalPrice,
+        amount: bookingResponse.data.total_price,
         payment_method: 'card',
         card_details: {
           number: paymentData.cardNumber,